@@ -0,0 +1,540 @@
+import sys
+import os
+import io
+import json
+import time
+import glob
+import platform
+import argparse
+import random
+import pickle
+import tempfile
+import tracemalloc
+from operator import attrgetter, itemgetter
+from Simulator import Simulator, Algorithm
+from Policy import StridePolicy
+from Process import Process
+from ReadyQueue import SortedReadyQueue
+from Trace import NullTraceSink, TextTraceSink
+from Instrumentation import Instrumentation
+from FcfsStats import fcfsStats
+from Loader import loadTable
+from Checkpoint import Checkpointer, loadCheckpoint
+from BinaryTrace import BinaryTraceSink, BinaryTraceReader, STRING_ARGS
+from project1 import readInput, formatTraces
+import Workload
+
+"""
+the algorithms project1.main runs, in the order it runs them
+"""
+ALGOS = [Algorithm.FCFS, Algorithm.SRT, Algorithm.RR]
+
+"""
+the directory holding the sample inputs and their golden outputs
+"""
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample-inputs")
+
+"""
+read a golden output file as text, without any newline translation so the comparison is byte-for-byte
+@param fileName: the golden file to read
+@returns the contents of the file
+"""
+def readGolden(fileName):
+    with open(fileName, newline='') as f:
+        return f.read()
+
+"""
+describe the first difference between two texts
+@param expected: the golden text
+@param actual: the text we produced
+@returns a short description of where the texts first differ
+"""
+def firstDifference(expected, actual):
+    expectedLines = expected.splitlines(True)
+    actualLines = actual.splitlines(True)
+    for i, (e, a) in enumerate(zip(expectedLines, actualLines)):
+        if (e != a):
+            return "line {0}: expected {1!r}, got {2!r}".format(i + 1, e, a)
+    return "expected {0} lines, got {1}".format(len(expectedLines), len(actualLines))
+
+"""
+run every algorithm over each sample input and compare the trace and stats, byte-for-byte, against the golden files
+@returns a list of failure descriptions, which is empty if everything matched
+"""
+def checkGoldens():
+    failures = []
+    for inputName in sorted(glob.glob(os.path.join(SAMPLE_DIR, "p1-input*.txt"))):
+        suffix = os.path.basename(inputName)[len("p1-input"):]
+        processes = readInput(inputName)
+        traces, stats = [], []
+        for algo in ALGOS:
+            out = io.StringIO()
+            sim = Simulator(algo, processes, trace=TextTraceSink(out))
+            sim.run()
+            traces.append(out.getvalue())
+            stats.append(sim.statsString())
+        for kind, actual in (("output", formatTraces(traces)), ("simout", "".join(stats))):
+            goldenName = os.path.join(SAMPLE_DIR, "p1-{0}{1}".format(kind, suffix))
+            expected = readGolden(goldenName)
+            if (actual != expected):
+                failures.append("{0}: {1}".format(os.path.basename(goldenName), firstDifference(expected, actual)))
+    return failures
+
+"""
+cross-check the FCFS stats-only fast path against the full simulator on each sample input and a few generated workloads,
+over a range of context switch times
+@param seed: the seed for the generated workloads
+@returns a list of failure descriptions, which is empty if every result matched
+"""
+def checkFastPath(seed=0):
+    workloads = [(os.path.basename(name), readInput(name)) for name in sorted(glob.glob(os.path.join(SAMPLE_DIR, "p1-input*.txt")))]
+    for meanInterarrival in (0, 100, 1500):
+        processes = list(Workload.generateProcesses(500, seed, meanInterarrival=meanInterarrival))
+        workloads.append(("generated-500-seed{0}-interarrival{1}".format(seed, meanInterarrival), processes))
+    #a workload with no bursts at all, as read from an input file that is empty or only comments
+    workloads.append(("empty", []))
+    failures = []
+    for name, processes in workloads:
+        for t_cs in (0, 3, 8, 16):
+            expected = Simulator(Algorithm.FCFS, processes, trace=NullTraceSink(), t_cs=t_cs).run()
+            actual = fcfsStats(processes, t_cs)
+            if (actual != expected):
+                failures.append("{0} t_cs={1}: fast path gave {2}, simulator gave {3}".format(name, t_cs, actual, expected))
+    return failures
+
+"""
+exercise every operation of SortedReadyQueue, including the removal and decrease-key that the simulator itself never
+uses, against a plain list kept sorted by the same keys, checking both the next process and the displayed order
+@param seed: the seed for the random operations
+@param numOps: the number of operations to apply
+@returns a list of failure descriptions, which is empty if the queue always agreed with the list
+"""
+def checkReadyQueue(seed=0, numOps=20000):
+    rng = random.Random(seed)
+    queued = [Process.fromFields("P{0}".format(i), 0, rng.randint(1, 50), 1, 0) for i in range(200)]
+    for fifoTies in (False, True):
+        queue = SortedReadyQueue(attrgetter("timeRemaining"), fifoTies)
+        #expected holds (timeRemaining, tie, arrival, process) for each queued process, sorted after every change
+        expected = []
+        waiting = list(queued)
+        for n in range(numOps):
+            op = rng.random()
+            if (waiting and (op < 0.4 or not expected)):
+                p = waiting.pop(rng.randrange(len(waiting)))
+                queue.put(p)
+                expected.append((p.timeRemaining, "" if fifoTies else p.pid, n, p))
+            elif (op < 0.6):
+                p = queue.get()
+                if (p is not expected.pop(0)[3]):
+                    return ["get returned {0} out of order (fifoTies={1})".format(p.pid, fifoTies)]
+                waiting.append(p)
+            elif (op < 0.75):
+                entry = expected.pop(rng.randrange(len(expected)))
+                if (rng.random() < 0.5):
+                    queue.removePid(entry[3].pid)
+                else:
+                    queue.remove(entry[3])
+                waiting.append(entry[3])
+            else:
+                #decrease-key: the process moves behind any others it now shares a key with
+                i = rng.randrange(len(expected))
+                p = expected[i][3]
+                p.timeRemaining = max(1, p.timeRemaining - rng.randint(0, 20))
+                queue.update(p)
+                expected[i] = (p.timeRemaining, "" if fifoTies else p.pid, n, p)
+            expected.sort(key=itemgetter(0, 1, 2))
+            if (queue.peek() is not (expected[0][3] if expected else None) or len(queue) != len(expected) or
+                    (n % 50 == 0 and queue.pids() != tuple(e[3].pid for e in expected))):
+                return ["queue disagrees with the sorted list after {0} operations (fifoTies={1})".format(n + 1, fifoTies)]
+    return []
+
+"""
+the trace of a workload in which B arrives while A is still switching in and preempts it: A's switch-in is cancelled,
+so only B's is counted, and A's wait is counted again from when it returns to the ready queue
+"""
+SWITCH_IN_PREEMPTION_TRACE = (
+    "time 0ms: Simulator started for SRT [Q <empty>]\n"
+    "time 0ms: Process A arrived and added to ready queue [Q A]\n"
+    "time 2ms: Process B arrived and will preempt A [Q <empty>]\n"
+    "time 10ms: Process B started using the CPU [Q A]\n"
+    "time 20ms: Process B terminated [Q A]\n"
+    "time 28ms: Process A started using the CPU [Q <empty>]\n"
+    "time 128ms: Process A terminated [Q <empty>]\n"
+    "time 132ms: Simulator ended for SRT")
+
+"""
+check SRT preempting a process that is still switching in, which none of the sample inputs do: first against a small
+workload worked through by hand, then on generated workloads dense enough to hit it often, which must run to completion
+@param seed: the seed for the generated workloads
+@returns a list of failure descriptions, which is empty if every run behaved as expected
+"""
+def checkSwitchInPreemption(seed=0):
+    failures = []
+    out = io.StringIO()
+    processes = [Process.fromFields("A", 0, 100, 1, 0), Process.fromFields("B", 2, 10, 1, 0)]
+    stats = Simulator(Algorithm.SRT, processes, trace=TextTraceSink(out)).run()
+    if (out.getvalue() != SWITCH_IN_PREEMPTION_TRACE):
+        failures.append("hand-built workload: {0}".format(firstDifference(SWITCH_IN_PREEMPTION_TRACE, out.getvalue())))
+    if ((stats.avgWaitTime, stats.totalContextSwitches, stats.totalPreemptions) != (9.0, 2, 1)):
+        failures.append("hand-built workload: expected wait 9.0, 2 context switches and 1 preemption, got {0}, {1} and {2}".format(
+            stats.avgWaitTime, stats.totalContextSwitches, stats.totalPreemptions))
+    for meanInterarrival in (0, 20, 100):
+        processes = list(Workload.generateProcesses(300, seed, meanInterarrival=meanInterarrival))
+        sim = Simulator(Algorithm.SRT, processes, trace=NullTraceSink())
+        try:
+            sim.run()
+        except Exception as e:
+            failures.append("generated-300-seed{0}-interarrival{1}: {2!r}".format(seed, meanInterarrival, e))
+            continue
+        if (sim.numTerminated != len(processes)):
+            failures.append("generated-300-seed{0}-interarrival{1}: {2} of {3} processes terminated".format(
+                seed, meanInterarrival, sim.numTerminated, len(processes)))
+    return failures
+
+"""
+check that the chunked loader gives the same table whatever the chunk size, on each sample input and a generated
+workload, and that comments and blank lines never add rows, even when a chunk holds nothing else or the file ends in a
+comment with no final newline
+@param seed: the seed for the generated workload
+@returns a list of failure descriptions, which is empty if every table matched
+"""
+def checkLoader(seed=0):
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        generatedName = os.path.join(directory, "generated.txt")
+        with open(generatedName, 'w') as f:
+            Workload.writeWorkload(f, 200, seed)
+        fileNames = sorted(glob.glob(os.path.join(SAMPLE_DIR, "p1-input*.txt"))) + [generatedName]
+        for fileName in fileNames:
+            expected = loadTable(fileName).columns()
+            for chunkSize in (1, 7, 64, 1000):
+                if (loadTable(fileName, chunkSize).columns() != expected):
+                    failures.append("{0}: chunk size {1} gave a different table".format(os.path.basename(fileName), chunkSize))
+        #each file's contents, and the (pid, arrival time) rows it should load as
+        cases = [("# only a comment\n#\n\n   \n", []),
+                 ("A|0|10|1|0\n# between\nB|5|20|2|30\n# end", [("A", 0), ("B", 5)])]
+        for i, (text, expectedRows) in enumerate(cases):
+            fileName = os.path.join(directory, "comments{0}.txt".format(i))
+            with open(fileName, 'w') as f:
+                f.write(text)
+            for chunkSize in (1, 4, 1 << 22):
+                table = loadTable(fileName, chunkSize)
+                rows = list(zip(table.pids, table.arrivalTimes))
+                if (len(table) != len(expectedRows) or rows != expectedRows):
+                    failures.append("{0!r}: chunk size {1} loaded {2}, expected {3}".format(text, chunkSize, rows, expectedRows))
+    return failures
+
+"""
+check that a run stopped part way through and resumed from its last snapshot gives the same trace and stats as an
+uninterrupted run, for every algorithm on each sample input and a generated workload. Each run is stopped half way,
+after several snapshots, and the trace written after the last of them is cut off before resuming, as
+Checkpoint.runWithCheckpoints does
+@param seed: the seed for the generated workload
+@param numSnapshots: roughly how many snapshots a whole run would save
+@returns a list of failure descriptions, which is empty if every resumed run matched
+"""
+def checkCheckpoints(seed=0, numSnapshots=8):
+    workloads = [(os.path.basename(name), readInput(name)) for name in sorted(glob.glob(os.path.join(SAMPLE_DIR, "p1-input*.txt")))]
+    workloads.append(("generated-300-seed{0}".format(seed), list(Workload.generateProcesses(300, seed, meanInterarrival=200))))
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        snapshotName = os.path.join(directory, "run.snapshot")
+        for name, processes in workloads:
+            for algo in Algorithm:
+                out = io.StringIO()
+                sim = Simulator(algo, processes, trace=TextTraceSink(out))
+                expectedStats = sim.run()
+                expected = out.getvalue()
+                endTime = sim.t
+                with open(os.path.join(directory, "run.trace"), 'w+', newline='') as traceFile:
+                    checkpointer = Checkpointer(snapshotName, max(1, sim.numEvents // numSnapshots), None, traceFile)
+                    sim = Simulator(algo, processes, trace=TextTraceSink(traceFile), checkpoint=checkpointer)
+                    sim.runUntil(endTime // 2)
+                    sim.trace.flush()
+                    if (checkpointer.numSaved == 0):
+                        failures.append("{0} {1}: no snapshot was saved by {2}ms".format(name, algo.name, endTime // 2))
+                        continue
+                    sim, traceOffset = loadCheckpoint(snapshotName)
+                    traceFile.truncate(traceOffset)
+                    traceFile.seek(traceOffset)
+                    sim.trace = TextTraceSink(traceFile)
+                    sim.checkpoint = None
+                    sim.resume()
+                    sim.trace.flush()
+                    traceFile.seek(0)
+                    actual = traceFile.read()
+                if (actual != expected):
+                    failures.append("{0} {1}: resumed trace {2}".format(name, algo.name, firstDifference(expected, actual)))
+                if (sim.stats() != expectedStats):
+                    failures.append("{0} {1}: resumed stats {2}, expected {3}".format(name, algo.name, sim.stats(), expectedStats))
+    return failures
+
+"""
+check a binary trace against the text trace of the same run: the reader must regenerate the text byte-for-byte, and a
+query for a time window and pid, with or without rebuilding the ready queues, must give exactly the lines of a full
+replay that fall in that window and mention that pid
+@param name: the name of the run, for failure descriptions
+@param reader: the reader of the binary trace
+@param expected: the text trace of the same run
+@returns a list of failure descriptions, which is empty if everything matched
+"""
+def compareBinaryTrace(name, reader, expected):
+    actual = reader.text()
+    if (actual != expected):
+        return ["{0}: replayed trace {1}".format(name, firstDifference(expected, actual))]
+    full = list(reader.query(withQueues=True))
+    if (not full):
+        return []
+    middle = full[len(full) // 2][0]
+    t1, t2 = full[len(full) // 3][0].time, full[2 * len(full) // 3][0].time
+    for pid in (None, middle.pid):
+        wanted = [line for line in full if t1 <= line[0].time <= t2 and (pid is None or line[0].pid == pid or
+                  (line[0].kind.value in STRING_ARGS and line[0].arg == pid))]
+        if (list(reader.query(t1, t2, pid, withQueues=True)) != wanted):
+            return ["{0}: query from {1}ms to {2}ms for {3} differs from a full replay".format(name, t1, t2, pid)]
+        if (list(reader.query(t1, t2, pid)) != [(record._replace(queue=None), length, None) for record, length, _ in wanted]):
+            return ["{0}: query without queues from {1}ms to {2}ms for {3} differs from a full replay".format(name, t1, t2, pid)]
+    return []
+
+"""
+check that binary traces replay exactly, for every algorithm on each sample input and a generated workload, on one CPU
+and on two with a shared or per-core ready queues, and for a stride run long enough that its pass values need more than
+32 bits. Small blocks make every query cross block boundaries
+@param seed: the seed for the generated workload
+@param blockRecords: the number of records in each block of the binary trace
+@returns a list of failure descriptions, which is empty if every trace matched
+"""
+def checkBinaryTraces(seed=0, blockRecords=16):
+    workloads = [(os.path.basename(name), readInput(name)) for name in sorted(glob.glob(os.path.join(SAMPLE_DIR, "p1-input*.txt")))]
+    workloads.append(("generated-200-seed{0}".format(seed), list(Workload.generateProcesses(200, seed, meanInterarrival=200))))
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        traceName = os.path.join(directory, "run.bin")
+        for name, processes in workloads:
+            for numCpus, perCoreQueues in ((1, False), (2, False), (2, True)):
+                for algo in Algorithm:
+                    out = io.StringIO()
+                    Simulator(algo, processes, trace=TextTraceSink(out), numCpus=numCpus, perCoreQueues=perCoreQueues).run()
+                    with BinaryTraceSink(traceName, blockRecords) as trace:
+                        Simulator(algo, processes, trace=trace, numCpus=numCpus, perCoreQueues=perCoreQueues).run()
+                    with BinaryTraceReader(traceName) as reader:
+                        failures += compareBinaryTrace("{0} {1} cpus={2}{3}".format(
+                            name, algo.name, numCpus, " per-core" if perCoreQueues else ""), reader, out.getvalue())
+        #a long stride run, whose passes grow well beyond 32 bits as single-ticket processes are charged slice after slice
+        processes = [Process.fromFields("A", 0, 1000, 300, 10), Process.fromFields("B", 0, 1000, 300, 10)]
+        out = io.StringIO()
+        Simulator(StridePolicy(tickets={"A": 1, "B": 1}), processes, trace=TextTraceSink(out)).run()
+        policy = StridePolicy(tickets={"A": 1, "B": 1})
+        try:
+            with BinaryTraceSink(traceName, blockRecords) as trace:
+                Simulator(policy, processes, trace=trace).run()
+        except ValueError as e:
+            return failures + ["long STRIDE: {0}".format(e)]
+        if (policy.globalPass < 1 << 32):
+            failures.append("long STRIDE: passes only reached {0}".format(policy.globalPass))
+        with BinaryTraceReader(traceName) as reader:
+            failures += compareBinaryTrace("long STRIDE", reader, out.getvalue())
+    return failures
+
+"""
+check the scheduling policies that have no golden outputs, SJF, MLFQ and STRIDE, on generated workloads with one CPU, two
+sharing a ready queue and three with their own: every process must terminate, the binary trace must replay as the text
+trace, and a run pickled half way and resumed must give the same trace and stats as an uninterrupted run
+@param seed: the seed for the generated workloads
+@returns a list of failure descriptions, which is empty if every run behaved as expected
+"""
+def checkPolicies(seed=0):
+    workloads = [("generated-100-seed{0}-interarrival{1}".format(seed, meanInterarrival),
+                  list(Workload.generateProcesses(100, seed, meanInterarrival=meanInterarrival))) for meanInterarrival in (0, 200)]
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        traceName = os.path.join(directory, "run.bin")
+        for name, processes in workloads:
+            for numCpus, perCoreQueues in ((1, False), (2, False), (3, True)):
+                for algo in (Algorithm.SJF, Algorithm.MLFQ, Algorithm.STRIDE):
+                    run = "{0} {1} cpus={2}{3}".format(name, algo.name, numCpus, " per-core" if perCoreQueues else "")
+                    out = io.StringIO()
+                    sim = Simulator(algo, processes, trace=TextTraceSink(out), numCpus=numCpus, perCoreQueues=perCoreQueues)
+                    expectedStats = sim.run()
+                    expected = out.getvalue()
+                    endTime = sim.t
+                    if (sim.numTerminated != len(processes)):
+                        failures.append("{0}: {1} of {2} processes terminated".format(run, sim.numTerminated, len(processes)))
+                    with BinaryTraceSink(traceName, 64) as trace:
+                        Simulator(algo, processes, trace=trace, numCpus=numCpus, perCoreQueues=perCoreQueues).run()
+                    with BinaryTraceReader(traceName) as reader:
+                        failures += compareBinaryTrace(run, reader, expected)
+                    #stop half way, then carry on from a pickled copy with a fresh trace sink
+                    out = io.StringIO()
+                    sim = Simulator(algo, processes, trace=TextTraceSink(out), numCpus=numCpus, perCoreQueues=perCoreQueues)
+                    sim.runUntil(endTime // 2)
+                    sim.trace.flush()
+                    sim = pickle.loads(pickle.dumps(sim, pickle.HIGHEST_PROTOCOL))
+                    sim.trace = TextTraceSink(out)
+                    sim.resume()
+                    sim.trace.flush()
+                    if (out.getvalue() != expected):
+                        failures.append("{0}: resumed trace {1}".format(run, firstDifference(expected, out.getvalue())))
+                    if (sim.stats() != expectedStats):
+                        failures.append("{0}: resumed stats {1}, expected {2}".format(run, sim.stats(), expectedStats))
+    return failures
+
+"""
+time the FCFS stats-only fast path
+@param processes: the processes to simulate
+@param repeats: the number of timed runs; the fastest is reported
+@returns the best time in seconds
+"""
+def timeFastPath(processes, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fcfsStats(processes)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+"""
+time a single quiet simulation run
+@param algo: the algorithm to simulate
+@param processes: the processes to simulate
+@param repeats: the number of timed runs; the fastest is reported
+@returns a (seconds, numEvents) tuple for the best of the timed repeats
+"""
+def timeRun(algo, processes, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sim = Simulator(algo, processes, trace=NullTraceSink())
+        sim.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, sim.numEvents
+
+"""
+measure the peak memory allocated during a single quiet simulation run
+@param algo: the algorithm to simulate
+@param processes: the processes to simulate
+@returns the peak number of bytes allocated by the run
+"""
+def peakMemory(algo, processes):
+    tracemalloc.start()
+    try:
+        Simulator(algo, processes, trace=NullTraceSink()).run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+"""
+run a single instrumented simulation and collect the event counts, time spent in each handler and queue high-water marks
+@param algo: the algorithm to simulate
+@param processes: the processes to simulate
+@returns the Instrumentation report for the run
+"""
+def handlerTimes(algo, processes):
+    instrumentation = Instrumentation()
+    Simulator(algo, processes, trace=NullTraceSink(), instrumentation=instrumentation).run()
+    return instrumentation.report()
+
+"""
+benchmark every algorithm over a single workload
+@param name: the label for this workload in the results
+@param processes: the processes to simulate
+@param repeats: the number of timed runs per algorithm; the fastest is reported
+@param profile: whether to also measure peak memory and per-handler time, which need their own (slower) runs
+@returns a list of result dicts, one per algorithm
+"""
+def benchmarkWorkload(name, processes, repeats, profile):
+    results = []
+    for algo in ALGOS:
+        seconds, numEvents = timeRun(algo, processes, repeats)
+        result = {"workload": name, "algorithm": algo.name, "processes": len(processes), "events": numEvents,
+                  "seconds": round(seconds, 6), "eventsPerSecond": round(numEvents / seconds) if seconds > 0 else None}
+        if (algo == Algorithm.FCFS):
+            result["fastPathSeconds"] = round(timeFastPath(processes, repeats), 6)
+        if (profile):
+            result["peakMemory"] = peakMemory(algo, processes)
+            result["handlers"] = handlerTimes(algo, processes)
+        results.append(result)
+        print("{0:>24} {1:>5} {2:>10} events {3:>10.4f}s {4:>12} events/s".format(
+            name, algo.name, numEvents, seconds, result["eventsPerSecond"]), file=sys.stderr)
+    return results
+
+"""
+print how each result compares to the matching result of an earlier run
+@param results: the results of this run
+@param baseline: the results of an earlier run, as saved by main
+"""
+def compareResults(results, baseline):
+    previous = {(r["workload"], r["algorithm"]): r for r in baseline["results"]}
+    for r in results:
+        old = previous.get((r["workload"], r["algorithm"]))
+        if (old != None and old["eventsPerSecond"] and r["eventsPerSecond"]):
+            print("{0:>24} {1:>5} {2:>+8.1%} events/s".format(
+                r["workload"], r["algorithm"], r["eventsPerSecond"] / old["eventsPerSecond"] - 1))
+
+"""
+run every correctness check, without any timing: the golden outputs, the FCFS fast path, the sorted ready queue, SRT
+preempting a process that is still switching in, the chunked loader, resuming from a checkpoint, replaying binary
+traces and the policies without golden outputs
+@param seed: the seed for the generated workloads and operations
+@returns a list of (name, failures) tuples, one for each check, where failures is empty if it passed
+"""
+def runChecks(seed=0):
+    return [("golden", checkGoldens()), ("fast path", checkFastPath(seed)), ("ready queue", checkReadyQueue(seed)),
+            ("switch-in preemption", checkSwitchInPreemption(seed)), ("loader", checkLoader(seed)),
+            ("checkpoint", checkCheckpoints(seed)), ("binary trace", checkBinaryTraces(seed)),
+            ("policies", checkPolicies(seed))]
+
+"""
+main method: check the goldens, benchmark the sample and generated workloads, then save and optionally compare the results.
+With --check-only, only the checks are run, so this can serve as a quick regression gate
+"""
+def main():
+    parser = argparse.ArgumentParser(description="Check the simulator against the golden outputs and measure its throughput")
+    parser.add_argument("--sizes", default="1000,10000", help="comma separated sizes of generated workloads (default: 1000,10000)")
+    parser.add_argument("--seed", type=int, default=0, help="the seed for generated workloads (default: 0)")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per algorithm and workload (default: 3)")
+    parser.add_argument("--no-profile", action="store_true", help="skip the peak memory and per-handler measurements")
+    parser.add_argument("--output", default=None, help="save the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="compare the results to those saved in this JSON file")
+    parser.add_argument("--check-only", action="store_true", help="run the correctness checks and exit, skipping the benchmark")
+    args = parser.parse_args()
+
+    checks = runChecks(args.seed)
+    for name, checkFailures in checks:
+        for failure in checkFailures:
+            print("{0} mismatch:".format(name), failure, file=sys.stderr)
+    (failures, fastPathFailures, queueFailures, switchInFailures, loaderFailures, checkpointFailures,
+        binaryTraceFailures, policyFailures) = (checkFailures for _, checkFailures in checks)
+    anyFailed = any(checkFailures for _, checkFailures in checks)
+    if (args.check_only):
+        print("{0} of {1} checks passed".format(sum(1 for _, checkFailures in checks if not checkFailures), len(checks)))
+        sys.exit(1 if anyFailed else 0)
+
+    results = []
+    for inputName in sorted(glob.glob(os.path.join(SAMPLE_DIR, "p1-input*.txt"))):
+        results += benchmarkWorkload(os.path.basename(inputName), readInput(inputName), args.repeats, not args.no_profile)
+    for n in (int(s) for s in args.sizes.split(',') if s.strip() != ""):
+        processes = list(Workload.generateProcesses(n, args.seed))
+        results += benchmarkWorkload("generated-{0}-seed{1}".format(n, args.seed), processes, args.repeats, not args.no_profile)
+
+    report = {"python": platform.python_version(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "goldensMatch": not failures, "goldenFailures": failures, "fastPathMatches": not fastPathFailures,
+              "fastPathFailures": fastPathFailures, "readyQueueMatches": not queueFailures,
+              "readyQueueFailures": queueFailures, "switchInPreemptionMatches": not switchInFailures,
+              "switchInPreemptionFailures": switchInFailures, "loaderMatches": not loaderFailures,
+              "loaderFailures": loaderFailures, "checkpointMatches": not checkpointFailures,
+              "checkpointFailures": checkpointFailures, "binaryTraceMatches": not binaryTraceFailures,
+              "binaryTraceFailures": binaryTraceFailures, "policiesMatch": not policyFailures,
+              "policyFailures": policyFailures, "results": results}
+    if (args.output != None):
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if (args.compare != None):
+        with open(args.compare) as f:
+            compareResults(results, json.load(f))
+    sys.exit(1 if anyFailed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,581 @@
+import sys
+import os
+import mmap
+import zlib
+import bisect
+import struct
+import argparse
+from operator import attrgetter
+from Simulator import Simulator, formatStats
+from Trace import TraceKind, TraceRecord, formatLine, NullTraceSink
+from ReadyQueue import FifoReadyQueue, SortedReadyQueue, PerCoreReadyQueues
+
+"""
+the magic string at the start and end of every binary trace file, and the format version
+"""
+MAGIC = b"SIMTRACE"
+VERSION = 3
+
+"""
+the file header: magic, version, number of ready queues, and how the queues are ordered
+"""
+HEADER = struct.Struct("<8sHHB")
+
+"""
+the ways a ready queue can be ordered, as recorded in the header: FIFO, sorted by key then pid (as SRT is), or sorted by
+key then arrival (as MLFQ is)
+"""
+ORDER_FIFO = 0
+ORDER_SORTED = 1
+ORDER_SORTED_FIFO_TIES = 2
+
+"""
+each event is one fixed-width record: a 32-bit time, the kind, an 8-bit cpu (or queue index), the pid index and a 64-bit
+arg. The arg is wide enough for any sort key, such as a stride pass, which only ever grows over a run; the unused high
+bytes of smaller args cost little once a block is compressed. The ready queue length is not repeated in every record,
+as the reader can count it from the queue changes
+"""
+RECORD = struct.Struct("<IBbiq")
+
+"""
+the records are written in zlib-compressed blocks of this many records. Fixed-width records within a block, and the time
+of each block's first record in the block index, let the reader binary search the file by time, decompressing one block
+"""
+BLOCK_RECORDS = 4096
+
+"""
+each block index entry: the file offset and compressed size of the block, its number of records and its first time,
+followed by the length of every ready queue at the start of the block, so a query can count lengths from there
+"""
+BLOCK = struct.Struct("<qIII")
+
+"""
+the file footer: the offset and number of entries of the string table, the offset and number of entries of the block
+index, and the magic string again
+"""
+FOOTER = struct.Struct("<qIqI8s")
+
+"""
+record kinds beyond the TraceKind values: a process joining a ready queue, with its sort key as the arg, the process
+at the front of a ready queue leaving it, and a process being removed from anywhere in a sorted queue. These let the
+reader rebuild the ready queue for every line
+"""
+QUEUE_PUT = 128
+QUEUE_GET = 129
+QUEUE_REMOVE = 130
+
+"""
+the TraceKinds whose arg is a string (an algorithm name or a pid), stored as an index into the string table
+"""
+STRING_ARGS = frozenset([TraceKind.Start.value, TraceKind.Stop.value, TraceKind.ArrivePreempt.value, TraceKind.IOPreempt.value])
+
+"""
+the value stored for a missing pid, arg or cpu
+"""
+NO_INDEX = -1
+NO_ARG = -(1 << 63)
+
+"""
+QueueEntry stands in for a Process in the ready queues the reader rebuilds; it has just its pid and the sort key it
+was queued with. Like a Process, each entry is distinct from every other, even one with the same pid and key
+"""
+class QueueEntry():
+    __slots__ = ("pid", "key")
+
+    def __init__(self, pid, key):
+        self.pid = pid
+        self.key = key
+
+"""
+get the order a ready queue keeps its processes in
+@param q: the ready queue
+@returns one of the ORDER_ values
+"""
+def queueOrder(q):
+    if (not isinstance(q, SortedReadyQueue)):
+        return ORDER_FIFO
+    return ORDER_SORTED_FIFO_TIES if q.fifoTies else ORDER_SORTED
+
+"""
+get the arg recorded when a process joins a FIFO ready queue, which has no sort key for the reader to order it by
+@param p: the process
+@returns NO_ARG
+"""
+def noKey(p):
+    return NO_ARG
+
+"""
+get the function giving the arg recorded when a process joins a ready queue: its sort key, or NO_ARG for a FIFO queue
+@param q: the ready queue
+@returns the function
+"""
+def queueKey(q):
+    return q.keyOf if isinstance(q, SortedReadyQueue) else noKey
+
+"""
+BinaryTraceSink writes the trace as fixed-width binary records with a string table for pids, compressed in blocks, which
+comes to about a tenth of the size of the text trace on generated workloads. It observes the simulator's ready queues
+directly, recording each change rather than the whole queue on every line, so the saving grows with the length of the
+ready queue. Times must fit in 32 bits, and args and sort keys in 64. The file is only complete once the sink is
+closed, which writes the last block, the string table, the block index and the footer
+"""
+class BinaryTraceSink():
+    enabled = True
+
+    """
+    BinaryTraceSink constructor: creates a new binary trace file
+    @param fileName: the file to write
+    @param blockRecords: the number of records to compress together in each block
+    @param level: the zlib compression level
+    """
+    def __init__(self, fileName, blockRecords=BLOCK_RECORDS, level=6):
+        self.file = open(fileName, 'wb')
+        self.blockRecords = blockRecords
+        self.level = level
+        #block accumulates the records of the current block, and blockTime and blockLengths are the time of its first
+        #record and the length of each ready queue when it started
+        self.block = bytearray()
+        self.numRecords = 0
+        self.blockTime = 0
+        self.blockLengths = None
+        #lengths counts the processes in each ready queue, as of the records written so far
+        self.lengths = None
+        #index accumulates the block index entries of the blocks already written
+        self.index = bytearray()
+        self.numBlocks = 0
+        #strings maps each pid or algorithm name to its index in the string table
+        self.strings = {}
+        #queues holds the ready queues being observed, once the first line has told us what they are
+        self.queues = None
+        #lastTime is the time of the latest line, which is also recorded against any queue changes that follow it
+        self.lastTime = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    """
+    get the string table index for a string, adding it if this is the first time it has been seen
+    @param s: the string
+    @returns its index
+    """
+    def stringIndex(self, s):
+        i = self.strings.get(s)
+        if (i is None):
+            i = self.strings[s] = len(self.strings)
+        return i
+
+    """
+    start observing the ready queues of a simulator: write the header, record whatever is already queued (as when
+    tracing a run resumed from a checkpoint), then shadow put and get on each queue so every change is recorded
+    @param readyQueue: the simulator's ready queue, or per-core view of queues
+    """
+    def attach(self, readyQueue):
+        self.queues = list(readyQueue.queues) if isinstance(readyQueue, PerCoreReadyQueues) else [readyQueue]
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.queues), queueOrder(self.queues[0])))
+        self.lengths = [0] * len(self.queues)
+        self.blockLengths = list(self.lengths)
+        for index, q in enumerate(self.queues):
+            key = queueKey(q)
+            for p in q:
+                self.lengths[index] += 1
+                self.append(self.lastTime, QUEUE_PUT, index, self.stringIndex(p.pid), key(p))
+            q.put = self.observePut(q, index, q.put)
+            q.get = self.observeGet(q, index, q.get)
+            if (isinstance(q, SortedReadyQueue)):
+                q.remove = self.observeRemove(q, index, q.remove)
+
+    """
+    add a record to the current block, writing the block out once it is full
+    @param t: the time
+    @param kind: the TraceKind value, or one of the QUEUE_ kinds
+    @param cpu: the cpu or queue index, or NO_INDEX
+    @param pid: the pid index, or NO_INDEX
+    @param arg: the arg, or NO_ARG
+    """
+    def append(self, t, kind, cpu, pid, arg):
+        try:
+            record = RECORD.pack(t, kind, cpu, pid, arg)
+        except struct.error:
+            raise ValueError("time {0}, cpu {1} or arg {2} does not fit in a binary trace record".format(t, cpu, arg)) from None
+        if (self.numRecords == 0):
+            self.blockTime = t
+        self.block += record
+        self.numRecords += 1
+        if (self.numRecords == self.blockRecords):
+            self.writeBlock()
+
+    """
+    compress the current block and write it out, adding its entry to the block index
+    """
+    def writeBlock(self):
+        if (self.numRecords == 0):
+            return
+        data = zlib.compress(bytes(self.block), self.level)
+        self.index += BLOCK.pack(self.file.tell(), len(data), self.numRecords, self.blockTime)
+        self.index += struct.pack("<{0}I".format(len(self.blockLengths)), *self.blockLengths)
+        self.numBlocks += 1
+        self.file.write(data)
+        self.block = bytearray()
+        self.numRecords = 0
+        self.blockLengths = list(self.lengths)
+
+    """
+    build a put method for a ready queue which also records the change
+    @param q: the ready queue
+    @param index: the index of the queue
+    @param put: the queue's own put method
+    @returns the observing put method
+    """
+    def observePut(self, q, index, put):
+        key = queueKey(q)
+        def observedPut(p):
+            put(p)
+            self.lengths[index] += 1
+            self.append(self.lastTime, QUEUE_PUT, index, self.stringIndex(p.pid), key(p))
+        return observedPut
+
+    """
+    build a get method for a ready queue which also records the change
+    @param q: the ready queue
+    @param index: the index of the queue
+    @param get: the queue's own get method
+    @returns the observing get method
+    """
+    def observeGet(self, q, index, get):
+        def observedGet():
+            p = get()
+            self.lengths[index] -= 1
+            self.append(self.lastTime, QUEUE_GET, index, self.stringIndex(p.pid), NO_ARG)
+            return p
+        return observedGet
+
+    """
+    build a remove method for a sorted ready queue which also records the change; removePid and update both go through it
+    @param q: the ready queue
+    @param index: the index of the queue
+    @param remove: the queue's own remove method
+    @returns the observing remove method
+    """
+    def observeRemove(self, q, index, remove):
+        def observedRemove(p):
+            remove(p)
+            self.lengths[index] -= 1
+            self.append(self.lastTime, QUEUE_REMOVE, index, self.stringIndex(p.pid), NO_ARG)
+        return observedRemove
+
+    """
+    write a single trace line as a record
+    @param t: the time of the line
+    @param kind: the TraceKind of the line
+    @param pid: the process the line refers to, or None
+    @param arg: the extra argument for the line, or None
+    @param readyQueue: the simulator's ready queue
+    @param cpu: the CPU the line refers to, or None
+    """
+    def write(self, t, kind, pid, arg, readyQueue, cpu=None):
+        if (self.queues is None):
+            self.attach(readyQueue)
+        self.lastTime = t
+        if (arg is None):
+            arg = NO_ARG
+        elif (kind.value in STRING_ARGS):
+            arg = self.stringIndex(arg)
+        self.append(t, kind.value, NO_INDEX if cpu is None else cpu, NO_INDEX if pid is None else self.stringIndex(pid), arg)
+
+    """
+    write out the records of the current block, even if it is not yet full
+    """
+    def flush(self):
+        self.writeBlock()
+        self.file.flush()
+
+    """
+    write the last block, the string table, the block index and the footer, then close the file
+    """
+    def close(self):
+        if (self.file.closed):
+            return
+        if (self.queues is None):
+            #nothing was ever logged, so there are no queues to describe
+            self.file.write(HEADER.pack(MAGIC, VERSION, 1, ORDER_FIFO))
+        self.flush()
+        tableOffset = self.file.tell()
+        table = "\n".join(sorted(self.strings, key=self.strings.get)).encode()
+        self.file.write(table)
+        indexOffset = self.file.tell()
+        self.file.write(self.index)
+        self.file.write(FOOTER.pack(tableOffset, len(self.strings), indexOffset, self.numBlocks, MAGIC))
+        self.file.close()
+
+"""
+BinaryTraceReader reads a binary trace through a memory map. It can regenerate the exact text trace, and answer queries
+such as every line for a process between two times by binary searching the block index and then the records by time
+"""
+class BinaryTraceReader():
+    """
+    BinaryTraceReader constructor: opens and maps a binary trace file
+    @param fileName: the file to read
+    """
+    def __init__(self, fileName):
+        self.file = open(fileName, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.numQueues, self.queueOrder = HEADER.unpack_from(self.map, 0)
+        tableOffset, numStrings, indexOffset, numBlocks, endMagic = FOOTER.unpack_from(self.map, len(self.map) - FOOTER.size)
+        if (magic != MAGIC or endMagic != MAGIC):
+            raise ValueError("{0} is not a complete binary trace".format(fileName))
+        if (version != VERSION):
+            raise ValueError("{0} is binary trace version {1}, not {2}".format(fileName, version, VERSION))
+        table = self.map[tableOffset:indexOffset].decode()
+        self.strings = table.split("\n") if numStrings else []
+        self.pidIndex = {s: i for i, s in enumerate(self.strings)}
+        #blocks holds the (offset, size, numRecords) of each block, and blockTimes, blockStarts and blockLengths the time
+        #of its first record, the index of its first record and the length of each ready queue when it starts
+        lengths = struct.Struct("<{0}I".format(self.numQueues))
+        self.blocks = []
+        self.blockTimes = []
+        self.blockStarts = []
+        self.blockLengths = []
+        self.numRecords = 0
+        for i in range(numBlocks):
+            offset = indexOffset + i * (BLOCK.size + lengths.size)
+            blockOffset, size, numRecords, firstTime = BLOCK.unpack_from(self.map, offset)
+            self.blocks.append((blockOffset, size, numRecords))
+            self.blockTimes.append(firstTime)
+            self.blockStarts.append(self.numRecords)
+            self.blockLengths.append(lengths.unpack_from(self.map, offset + BLOCK.size))
+            self.numRecords += numRecords
+        #cached holds the index and decompressed records of the last block read
+        self.cached = (None, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.numRecords
+
+    """
+    get the decompressed records of a block
+    @param b: the index of the block
+    @returns the records as bytes
+    """
+    def block(self, b):
+        if (self.cached[0] != b):
+            offset, size, _ = self.blocks[b]
+            self.cached = (b, zlib.decompress(self.map[offset:offset + size]))
+        return self.cached[1]
+
+    """
+    get the raw records in a range
+    @param first: the index of the first record
+    @param last: one past the index of the last record, or None for the end of the file
+    @returns an iterator of (time, kind, cpu, pid, arg) tuples, with pid and string args as table indices
+    """
+    def records(self, first=0, last=None):
+        last = self.numRecords if last is None else last
+        b = bisect.bisect_right(self.blockStarts, first) - 1
+        while (first < last):
+            start = self.blockStarts[b]
+            end = min(last, start + self.blocks[b][2])
+            yield from RECORD.iter_unpack(self.block(b)[(first - start) * RECORD.size:(end - start) * RECORD.size])
+            first = end
+            b += 1
+
+    """
+    find the first record at or after a time
+    @param t: the time to search for
+    @returns the index of the first record whose time is at least t
+    """
+    def find(self, t):
+        #every block from b on starts at or after t, so the record is either in the block before or is the first of block b
+        b = bisect.bisect_left(self.blockTimes, t)
+        if (b == 0):
+            return 0
+        data = self.block(b - 1)
+        lo, hi = 0, self.blocks[b - 1][2]
+        while (lo < hi):
+            mid = (lo + hi) // 2
+            if (struct.unpack_from("<I", data, mid * RECORD.size)[0] < t):
+                lo = mid + 1
+            else:
+                hi = mid
+        return self.blockStarts[b - 1] + lo
+
+    """
+    get the length of each ready queue just before a record, counting from the start of its block
+    @param first: the index of the record
+    @returns a list of lengths, one for each queue
+    """
+    def queueLengths(self, first):
+        if (not self.blocks):
+            return [0] * self.numQueues
+        b = max(bisect.bisect_right(self.blockStarts, first) - 1, 0)
+        lengths = list(self.blockLengths[b])
+        for record in self.records(self.blockStarts[b], first):
+            self.count(lengths, record)
+        return lengths
+
+    """
+    apply a queue change record to the queue lengths
+    @param lengths: the length of each ready queue, which is updated
+    @param record: the raw record; it is skipped if it is not a queue change
+    """
+    def count(self, lengths, record):
+        kind = record[1]
+        if (kind == QUEUE_PUT):
+            lengths[record[2]] += 1
+        elif (kind == QUEUE_GET or kind == QUEUE_REMOVE):
+            lengths[record[2]] -= 1
+
+    """
+    build a set of empty ready queues of the kind the trace was written with
+    @returns a (queues, view) tuple of the list of queues and the object whose render matches the simulator's ReadyQueue
+    """
+    def makeQueues(self):
+        if (self.queueOrder == ORDER_FIFO):
+            queues = [FifoReadyQueue() for _ in range(self.numQueues)]
+        else:
+            fifoTies = self.queueOrder == ORDER_SORTED_FIFO_TIES
+            queues = [SortedReadyQueue(attrgetter("key"), fifoTies) for _ in range(self.numQueues)]
+        return queues, PerCoreReadyQueues(queues) if self.numQueues > 1 else queues[0]
+
+    """
+    convert a raw line record to a TraceRecord
+    @param record: the raw record
+    @param queue: the pids in the ready queue, or None
+    @returns the TraceRecord
+    """
+    def toTraceRecord(self, record, queue):
+        t, kind, cpu, pid, arg = record[:5]
+        if (arg == NO_ARG):
+            arg = None
+        elif (kind in STRING_ARGS):
+            arg = self.strings[arg]
+        return TraceRecord(t, TraceKind(kind), None if pid == NO_INDEX else self.strings[pid], arg, queue,
+                           None if cpu == NO_INDEX else cpu)
+
+    """
+    find the trace lines between two times, optionally for a single process
+    @param t1: the earliest time, or None for the start of the trace
+    @param t2: the latest time, or None for the end of the trace
+    @param pid: only include lines about this process, either as the subject or as the process being preempted
+    @param withQueues: rebuild the ready queue for each line, which means replaying every queue change before t1;
+                       otherwise only the queue length is known, and each record's queue is None
+    @returns a generator yielding (TraceRecord, queueLength, renderedQueue) tuples, where renderedQueue is None unless withQueues
+    """
+    def query(self, t1=None, t2=None, pid=None, withQueues=False):
+        first = 0 if t1 is None else self.find(t1)
+        last = self.numRecords if t2 is None else self.find(t2 + 1)
+        pidIndex = None
+        if (pid != None):
+            pidIndex = self.pidIndex.get(pid)
+            if (pidIndex is None):
+                return
+        queues = view = None
+        if (withQueues):
+            queues, view = self.makeQueues()
+            self.replay(queues, self.records(0, first))
+            lengths = [len(q) for q in queues]
+        else:
+            lengths = self.queueLengths(first)
+        for record in self.records(first, last):
+            kind = record[1]
+            if (kind >= QUEUE_PUT):
+                self.count(lengths, record)
+                if (queues != None):
+                    self.replay(queues, (record,))
+                continue
+            if (pidIndex != None and record[3] != pidIndex and not (kind in STRING_ARGS and record[4] == pidIndex)):
+                continue
+            if (view != None):
+                yield self.toTraceRecord(record, view.pids()), sum(lengths), view.render()
+            else:
+                yield self.toTraceRecord(record, None), sum(lengths), None
+
+    """
+    apply the queue changes among some records to a set of ready queues
+    @param queues: the ready queues being rebuilt
+    @param records: the raw records; any that are not queue changes are skipped
+    """
+    def replay(self, queues, records):
+        strings = self.strings
+        for t, kind, index, pid, arg in records:
+            if (kind == QUEUE_PUT):
+                queues[index].put(QueueEntry(strings[pid], arg))
+            elif (kind == QUEUE_GET):
+                queues[index].get()
+            elif (kind == QUEUE_REMOVE):
+                queues[index].removePid(strings[pid])
+
+    """
+    regenerate text trace lines, exactly as a TextTraceSink would have written them
+    @param t1: the earliest time, or None for the start of the trace
+    @param t2: the latest time, or None for the end of the trace
+    @param pid: only include lines about this process, or None for every line
+    @returns a generator yielding each line
+    """
+    def lines(self, t1=None, t2=None, pid=None):
+        for record, _, rendered in self.query(t1, t2, pid, withQueues=True):
+            yield formatLine(record.time, record.kind, record.pid, record.arg, rendered, record.cpu)
+
+    """
+    regenerate the whole text trace
+    @returns the text trace as a single string
+    """
+    def text(self):
+        return "".join(self.lines())
+
+"""
+run a single simulation with its trace written to a binary file in the specified directory, named after the algorithm;
+this is a drop-in replacement for project1.runSimulation
+@param algo: the algorithm to simulate
+@param processes: the processes to simulate
+@param quiet: whether to skip the trace entirely
+@param directory: the directory to write the binary trace to
+@returns a (trace, stats) tuple of strings; the trace is always empty, as it is in the binary file instead
+"""
+def runWithBinaryTrace(algo, processes, quiet, directory):
+    if (quiet):
+        return "", formatStats(Simulator(algo, processes, trace=NullTraceSink()).run())
+    os.makedirs(directory, exist_ok=True)
+    with BinaryTraceSink(os.path.join(directory, algo.name + ".bin")) as trace:
+        stats = Simulator(algo, processes, trace=trace).run()
+    return "", formatStats(stats)
+
+"""
+main method: print the text trace, or a selection of it, from a binary trace file
+"""
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate or query the text trace stored in a binary trace file")
+    parser.add_argument("trace", help="the binary trace file")
+    parser.add_argument("--pid", default=None, help="only show lines about this process")
+    parser.add_argument("--from", dest="t1", type=int, default=None, help="only show lines at or after this time (ms)")
+    parser.add_argument("--to", dest="t2", type=int, default=None, help="only show lines at or before this time (ms)")
+    parser.add_argument("--count", action="store_true", help="only print the number of matching lines")
+    parser.add_argument("--no-queue", action="store_true",
+                        help="show the ready queue length rather than its contents, which avoids replaying the trace up to --from")
+    args = parser.parse_args()
+
+    with BinaryTraceReader(args.trace) as reader:
+        if (args.count):
+            print(sum(1 for _ in reader.query(args.t1, args.t2, args.pid)))
+        elif (args.no_queue):
+            for record, length, _ in reader.query(args.t1, args.t2, args.pid):
+                sys.stdout.write(formatLine(record.time, record.kind, record.pid, record.arg, "[Q length {0}]".format(length),
+                                            record.cpu).rstrip("\n") + "\n")
+        else:
+            out = sys.stdout
+            for line in reader.lines(args.t1, args.t2, args.pid):
+                out.write(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import os
+import json
+import zlib
+import pickle
+from Simulator import Simulator
+from Trace import NullTraceSink, TextTraceSink
+from Loader import inputHash
+
+"""
+the format version written into every snapshot; a snapshot from any other version is refused rather than misread
+"""
+SNAPSHOT_VERSION = 4
+
+"""
+write a file so that it is either completely replaced or left untouched, even if we are killed part way through
+@param fileName: the file to write
+@param data: the bytes to write
+"""
+def writeAtomically(fileName, data):
+    tmpName = fileName + ".tmp"
+    with open(tmpName, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmpName, fileName)
+
+"""
+Checkpointer periodically saves the full state of a running Simulator to a compressed snapshot file, every N events,
+every T simulated milliseconds, or both. The simulator asks it whether a snapshot is due at the end of each time step
+"""
+class Checkpointer():
+    """
+    Checkpointer constructor: creates a new checkpointer
+    @param fileName: the snapshot file, which is replaced atomically by each new snapshot
+    @param everyEvents: save after this many more events have been processed; None disables this trigger
+    @param everyMs: save after this many more simulated milliseconds have passed; None disables this trigger
+    @param traceStream: the file the trace is written to, whose offset is saved with each snapshot so a resumed run can
+                        cut off anything written after it; None if the trace is not being kept
+    @param level: the zlib compression level
+    """
+    def __init__(self, fileName, everyEvents=None, everyMs=None, traceStream=None, level=6):
+        self.fileName = fileName
+        self.everyEvents = everyEvents
+        self.everyMs = everyMs
+        self.traceStream = traceStream
+        self.level = level
+        #numSaved counts the snapshots written so far
+        self.numSaved = 0
+        self.nextEvents = everyEvents if everyEvents else float("inf")
+        self.nextTime = everyMs if everyMs else float("inf")
+
+    """
+    schedule the next snapshot relative to the current state of the specified simulator
+    @param sim: the simulator being checkpointed
+    """
+    def reset(self, sim):
+        self.nextEvents = sim.numEvents + self.everyEvents if self.everyEvents else float("inf")
+        self.nextTime = sim.t + self.everyMs if self.everyMs else float("inf")
+
+    """
+    check whether a snapshot is due
+    @param sim: the simulator being checkpointed
+    @returns True if either trigger has been reached, otherwise False
+    """
+    def due(self, sim):
+        return sim.numEvents >= self.nextEvents or sim.t >= self.nextTime
+
+    """
+    save a snapshot of the specified simulator, after making sure every trace line it has logged so far is on disk
+    @param sim: the simulator to save
+    """
+    def save(self, sim):
+        sim.trace.flush()
+        traceOffset = None
+        if (self.traceStream != None):
+            os.fsync(self.traceStream.fileno())
+            traceOffset = self.traceStream.tell()
+        data = pickle.dumps((SNAPSHOT_VERSION, traceOffset, sim), pickle.HIGHEST_PROTOCOL)
+        writeAtomically(self.fileName, zlib.compress(data, self.level))
+        self.numSaved += 1
+        self.reset(sim)
+
+"""
+load a snapshot saved by a Checkpointer
+@param fileName: the snapshot file
+@returns a (sim, traceOffset) tuple of the restored simulator, with tracing off, and the trace offset saved with it
+"""
+def loadCheckpoint(fileName):
+    with open(fileName, 'rb') as f:
+        version, traceOffset, sim = pickle.loads(zlib.decompress(f.read()))
+    if (version != SNAPSHOT_VERSION):
+        raise ValueError("{0} was saved by snapshot version {1}, not {2}".format(fileName, version, SNAPSHOT_VERSION))
+    return sim, traceOffset
+
+"""
+start or continue a checkpointed run in the specified directory. A new run records the workload and the current size
+of the stats file in a manifest; resuming checks the manifest matches and returns that size, so the caller can cut off
+anything a previous attempt appended to the stats file before it died
+@param directory: the directory holding the run's snapshots, traces and manifest
+@param processes: the processes being simulated
+@param statsName: the stats file the run will append to
+@param quiet: whether the run skips the trace
+@param resume: whether to continue an earlier run rather than start a new one
+@returns the offset to truncate the stats file to before writing to it
+"""
+def openRun(directory, processes, statsName, quiet, resume):
+    manifestName = os.path.join(directory, "manifest.json")
+    if (resume):
+        if (not os.path.exists(manifestName)):
+            raise ValueError("there is no checkpointed run to resume in {0}".format(directory))
+        with open(manifestName) as f:
+            manifest = json.load(f)
+        if (manifest["input"] != inputHash(processes)):
+            raise ValueError("the run in {0} was started with a different input".format(directory))
+        if (manifest["quiet"] != quiet):
+            raise ValueError("the run in {0} was started {1} --quiet".format(directory, "with" if manifest["quiet"] else "without"))
+        return manifest["statsOffset"]
+    os.makedirs(directory, exist_ok=True)
+    statsOffset = os.path.getsize(statsName) if os.path.exists(statsName) else 0
+    manifest = {"input": inputHash(processes), "quiet": quiet, "statsOffset": statsOffset}
+    writeAtomically(manifestName, json.dumps(manifest).encode())
+    return statsOffset
+
+"""
+run a single simulation with periodic snapshots, or carry on from its last snapshot, with the trace kept in a file
+alongside them; this is a drop-in replacement for project1.runSimulation. An algorithm that already finished in an
+earlier attempt is not run again
+@param algo: the algorithm to simulate
+@param processes: the processes to simulate
+@param quiet: whether to skip the trace entirely
+@param directory: the directory holding the run's snapshots and traces
+@param everyEvents: save a snapshot after this many events; None disables this trigger
+@param everyMs: save a snapshot after this many simulated milliseconds; None disables this trigger
+@param resume: whether to continue from an earlier attempt rather than start again
+@returns a (trace, stats) tuple of strings, identical to those of an uninterrupted run
+"""
+def runWithCheckpoints(algo, processes, quiet, directory, everyEvents=None, everyMs=None, resume=False):
+    base = os.path.join(directory, algo.name)
+    snapshotName, traceName, statsName = base + ".snapshot", base + ".trace", base + ".stats"
+    if (resume and os.path.exists(statsName)):
+        #this algorithm finished in an earlier attempt
+        return readText(traceName) if not quiet else "", readText(statsName)
+    if (not resume or not os.path.exists(snapshotName)):
+        resume = False
+        for name in (snapshotName, statsName):
+            if (os.path.exists(name)):
+                os.remove(name)
+
+    traceFile = None
+    if (resume):
+        sim, traceOffset = loadCheckpoint(snapshotName)
+        if (not quiet):
+            #cut off anything logged after the snapshot was taken, as the resumed run will log it again
+            traceFile = open(traceName, 'r+', newline='')
+            traceFile.truncate(traceOffset)
+            traceFile.seek(traceOffset)
+    elif (not quiet):
+        traceFile = open(traceName, 'w', newline='')
+    try:
+        trace = NullTraceSink() if quiet else TextTraceSink(traceFile)
+        checkpointer = Checkpointer(snapshotName, everyEvents, everyMs, traceFile)
+        if (resume):
+            sim.trace = trace
+            sim.checkpoint = checkpointer
+            checkpointer.reset(sim)
+            sim.resume()
+        else:
+            sim = Simulator(algo, processes, trace=trace, checkpoint=checkpointer)
+            sim.run()
+        trace.flush()
+    finally:
+        if (traceFile != None):
+            traceFile.close()
+
+    stats = sim.statsString()
+    writeAtomically(statsName, stats.encode())
+    if (os.path.exists(snapshotName)):
+        os.remove(snapshotName)
+    return readText(traceName) if not quiet else "", stats
+
+"""
+read a whole text file without any newline translation
+@param fileName: the file to read
+@returns the contents of the file
+"""
+def readText(fileName):
+    with open(fileName, newline='') as f:
+        return f.read()
@@ -0,0 +1,172 @@
+import heapq
+
+"""
+HeapEventQueue is the default event engine for our simulator: a plain binary heap with no locking.
+Each entry is a precomputed (time, eType priority, pid, seq, event) tuple, so ordering is resolved entirely by
+tuple comparison in C rather than by calling Event.__lt__ for every sift.
+Cancelled events are left in place as tombstones and discarded lazily when they reach the top of the heap
+"""
+class HeapEventQueue():
+    """
+    HeapEventQueue constructor: creates a new, empty event queue
+    """
+    def __init__(self):
+        #heap holds our (time, priority, pid, seq, event) entries
+        self.heap = []
+        #seq is a monotonically increasing counter used to break ties between otherwise identical keys
+        self.seq = 0
+        #size counts only live (non-cancelled) events
+        self.size = 0
+
+    """
+    add an event to the queue
+    @param event: the event to add
+    """
+    def put(self, event):
+        self.seq += 1
+        heapq.heappush(self.heap, (event.time, event.priority, event.process.pid, self.seq, event))
+        self.size += 1
+
+    """
+    remove and return the next live event in time order
+    @returns the next event to occur
+    """
+    def get(self):
+        self.dropCancelled()
+        self.size -= 1
+        return heapq.heappop(self.heap)[4]
+
+    """
+    cancel the specified pending event in O(1) by marking it as a tombstone; it is discarded once it reaches the top
+    @param event: the pending event to cancel
+    """
+    def cancel(self, event):
+        if (not event.cancelled):
+            event.cancelled = True
+            self.size -= 1
+
+    """
+    pop any tombstones sitting at the top of the heap
+    """
+    def dropCancelled(self):
+        heap = self.heap
+        while (heap and heap[0][4].cancelled):
+            heapq.heappop(heap)
+
+    """
+    get the time of the next live event without removing it
+    @returns the time of the next event, or None if the queue is empty
+    """
+    def peekTime(self):
+        self.dropCancelled()
+        return self.heap[0][0] if self.heap else None
+
+    """
+    check whether there are any live events left in the queue
+    @returns True if the queue is empty, otherwise False
+    """
+    def empty(self):
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    """
+    iterate over every live pending event in no particular order
+    """
+    def __iter__(self):
+        return (entry[4] for entry in self.heap if not entry[4].cancelled)
+
+"""
+CalendarEventQueue is a bucket queue for dense integer-ms timelines: events are grouped into one small heap per
+distinct time, and a separate heap holds only the distinct times. When many events share the same millisecond
+(as they do for bulk arrivals and context switches), each push only sifts within its own bucket.
+Like HeapEventQueue, cancelled events are left behind as tombstones and skipped lazily
+"""
+class CalendarEventQueue():
+    """
+    CalendarEventQueue constructor: creates a new, empty event queue
+    """
+    def __init__(self):
+        #buckets maps each time to a heap of (priority, pid, seq, event) entries occurring at that time
+        self.buckets = {}
+        #times is a heap of the distinct times that currently have a bucket
+        self.times = []
+        self.seq = 0
+        self.size = 0
+
+    """
+    add an event to the queue
+    @param event: the event to add
+    """
+    def put(self, event):
+        self.seq += 1
+        bucket = self.buckets.get(event.time)
+        if (bucket is None):
+            bucket = self.buckets[event.time] = []
+            heapq.heappush(self.times, event.time)
+        heapq.heappush(bucket, (event.priority, event.process.pid, self.seq, event))
+        self.size += 1
+
+    """
+    remove and return the next live event in time order
+    @returns the next event to occur
+    """
+    def get(self):
+        self.dropCancelled()
+        t = self.times[0]
+        bucket = self.buckets[t]
+        event = heapq.heappop(bucket)[3]
+        #drop the bucket once it has been drained
+        if (not bucket):
+            del self.buckets[t]
+            heapq.heappop(self.times)
+        self.size -= 1
+        return event
+
+    """
+    cancel the specified pending event in O(1) by marking it as a tombstone; it is discarded once it reaches the top
+    @param event: the pending event to cancel
+    """
+    def cancel(self, event):
+        if (not event.cancelled):
+            event.cancelled = True
+            self.size -= 1
+
+    """
+    pop any tombstones sitting at the front of the earliest buckets, dropping buckets that become empty
+    """
+    def dropCancelled(self):
+        while (self.times):
+            t = self.times[0]
+            bucket = self.buckets[t]
+            while (bucket and bucket[0][3].cancelled):
+                heapq.heappop(bucket)
+            if (bucket):
+                return
+            del self.buckets[t]
+            heapq.heappop(self.times)
+
+    """
+    get the time of the next live event without removing it
+    @returns the time of the next event, or None if the queue is empty
+    """
+    def peekTime(self):
+        self.dropCancelled()
+        return self.times[0] if self.times else None
+
+    """
+    check whether there are any live events left in the queue
+    @returns True if the queue is empty, otherwise False
+    """
+    def empty(self):
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    """
+    iterate over every live pending event in no particular order
+    """
+    def __iter__(self):
+        return (entry[3] for bucket in self.buckets.values() for entry in bucket if not entry[3].cancelled)
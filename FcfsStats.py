@@ -0,0 +1,73 @@
+import heapq
+from collections import deque
+from Simulator import Stats, Algorithm, EventType
+from Loader import ProcessTable
+
+"""
+the event priorities of the two ways a process joins the ready queue, as used by the event queue to order events that
+happen at the same time: a process returning from i/o is queued before one arriving for the first time
+"""
+FINISH_BLOCKED = EventType.FinishBlocked.value
+ARRIVE = EventType.Arrive.value
+
+"""
+compute the FCFS summary statistics for a single CPU without simulating individual events. Under FCFS every burst runs
+to completion, so the whole run is determined by the order in which processes join the ready queue: the CPU takes the
+head of the queue as soon as its last context switch out has finished, and the only events that matter are arrivals and
+i/o returns. This replays just those with one heap over the process columns, in the same order the event queue would
+process them, and accumulates wait and turnaround times as it goes. Tracing and maxTime are not supported; the result
+is identical to the stats of a full FCFS Simulator run with numCpus=1
+@param processes: a list of processes, or a ProcessTable
+@param t_cs: the context switch time (in milliseconds)
+@returns the resulting Stats tuple
+"""
+def fcfsStats(processes, t_cs=8):
+    if (isinstance(processes, ProcessTable)):
+        pids, arrivalTimes, burstTimes, numBursts, ioTimes = processes.columns()
+    else:
+        pids = [p.pid for p in processes]
+        arrivalTimes = [p.arrivalTime for p in processes]
+        burstTimes = [p.cpuBurstTime for p in processes]
+        numBursts = [p.numBursts for p in processes]
+        ioTimes = [p.ioTime for p in processes]
+    n = len(pids)
+    half = t_cs // 2
+    totalBursts = sum(numBursts)
+    totalBurstTime = sum(map(int.__mul__, burstTimes, numBursts))
+    remaining = list(numBursts)
+
+    #pending holds a (time, priority, pid, seq, index) entry for each process waiting to join the ready queue, keyed
+    #exactly as the event queue keys the corresponding Arrive or FinishBlocked event
+    pending = list(zip(arrivalTimes, [ARRIVE] * n, pids, range(n), range(n)))
+    heapq.heapify(pending)
+    seq = n
+    #queue holds (index, time joined) for each process in the ready queue
+    queue = deque()
+    #cpuFree is the time at which the CPU finishes switching out its last process
+    cpuFree = 0
+    waitTime = 0
+    turnaroundTime = 0
+    maxTurnaroundTime = 0
+    while (pending or queue):
+        #the CPU takes its next process once it is free and something is queued, whichever happens later
+        t = cpuFree if (queue or pending[0][0] <= cpuFree) else pending[0][0]
+        #everything that joins the ready queue up to and including now is queued before the CPU takes the head
+        while (pending and pending[0][0] <= t):
+            entry = heapq.heappop(pending)
+            queue.append((entry[4], entry[0]))
+        i, joined = queue.popleft()
+        waitTime += t - joined
+        #switch in, run the whole burst, then switch out
+        finish = t + half + burstTimes[i]
+        cpuFree = finish + half
+        turnaroundTime += cpuFree - joined
+        maxTurnaroundTime = max(maxTurnaroundTime, cpuFree - joined)
+        remaining[i] -= 1
+        if (remaining[i] > 0):
+            seq += 1
+            heapq.heappush(pending, (cpuFree + ioTimes[i], FINISH_BLOCKED, pids[i], seq, i))
+
+    #an empty workload averages to 0, as it does in Simulator.stats
+    bursts = totalBursts or 1
+    return Stats(Algorithm.FCFS.name, round(totalBurstTime / bursts, 2), round(waitTime / bursts, 2),
+                 round(turnaroundTime / bursts, 2), totalBursts, 0, False, (totalBursts,), maxTurnaroundTime)
@@ -0,0 +1,112 @@
+import time
+import cProfile
+import pstats
+from Simulator import EventType
+
+"""
+Instrumentation collects opt-in statistics about a simulation run: how many events of each type were processed, the
+cumulative time spent in each handler, and the largest the event queue and ready queue grew. It is attached by passing
+it to the Simulator constructor, which lets it replace the handler table with timed wrappers; an uninstrumented
+simulator never goes through this code at all
+"""
+class Instrumentation():
+    """
+    Instrumentation constructor: creates a new, empty set of counters
+    @param sampleEvery: call the sampler on every Nth event; 0 disables sampling
+    @param sampler: a function (sim, event, handler) which must call handler(event) itself, e.g. a CProfileSampler;
+                    required if sampleEvery is set
+    """
+    def __init__(self, sampleEvery=0, sampler=None):
+        if (sampleEvery and sampler is None):
+            raise ValueError("sampleEvery needs a sampler to call")
+        #counts and seconds map each handler name to the number of calls and the cumulative time spent in it
+        self.counts = {}
+        self.seconds = {}
+        #high-water marks for the number of live events and ready processes, sampled after every handler
+        self.maxEvents = 0
+        self.maxReady = 0
+        self.sampleEvery = sampleEvery
+        self.sampler = sampler
+        self.numEvents = 0
+
+    """
+    wrap every handler of the specified simulator, along with its ready queue check, in a timed version
+    @param sim: the simulator to instrument
+    """
+    def attach(self, sim):
+        for value, handler in list(sim.handlers.items()):
+            sim.handlers[value] = self.wrapHandler(sim, EventType(value).name, handler)
+        #updateReadyQueue is called directly by run rather than through the handler table, so we shadow it on the instance
+        sim.updateReadyQueue = self.wrapCall("updateReadyQueue", sim.updateReadyQueue)
+
+    """
+    build a timed wrapper for a single event handler
+    @param sim: the simulator the handler belongs to
+    @param name: the name to record the handler under
+    @param handler: the handler to wrap
+    @returns the wrapped handler
+    """
+    def wrapHandler(self, sim, name, handler):
+        self.counts.setdefault(name, 0)
+        self.seconds.setdefault(name, 0.0)
+        def instrumented(event):
+            self.numEvents += 1
+            start = time.perf_counter()
+            if (self.sampleEvery and self.numEvents % self.sampleEvery == 0):
+                self.sampler(sim, event, handler)
+            else:
+                handler(event)
+            self.seconds[name] += time.perf_counter() - start
+            self.counts[name] += 1
+            #update our high-water marks now that the handler has had its effect
+            if (len(sim.events) > self.maxEvents):
+                self.maxEvents = len(sim.events)
+            if (len(sim.ReadyQueue) > self.maxReady):
+                self.maxReady = len(sim.ReadyQueue)
+        return instrumented
+
+    """
+    build a timed wrapper for a method that takes no arguments
+    @param name: the name to record the method under
+    @param method: the method to wrap
+    @returns the wrapped method
+    """
+    def wrapCall(self, name, method):
+        self.counts.setdefault(name, 0)
+        self.seconds.setdefault(name, 0.0)
+        def instrumented():
+            start = time.perf_counter()
+            method()
+            self.seconds[name] += time.perf_counter() - start
+            self.counts[name] += 1
+        return instrumented
+
+    """
+    get everything collected so far
+    @returns a dict of counts, seconds and high-water marks
+    """
+    def report(self):
+        return {"counts": dict(self.counts), "seconds": {k: round(v, 6) for k, v in self.seconds.items()},
+                "maxEvents": self.maxEvents, "maxReady": self.maxReady}
+
+"""
+CProfileSampler is a sampler for Instrumentation which runs each sampled handler call under cProfile, so the profile
+covers a representative fraction of the run at a fraction of the overhead of profiling everything
+"""
+class CProfileSampler():
+    """
+    CProfileSampler constructor: creates a new sampler with its own profiler
+    """
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def __call__(self, sim, event, handler):
+        self.profiler.runcall(handler, event)
+
+    """
+    print the collected profile
+    @param sortBy: the pstats sort key
+    @param limit: the number of functions to show
+    """
+    def printStats(self, sortBy="cumulative", limit=20):
+        pstats.Stats(self.profiler).sort_stats(sortBy).print_stats(limit)
@@ -0,0 +1,217 @@
+import re
+import gc
+import hashlib
+from contextlib import contextmanager
+from array import array
+from itertools import repeat
+from Process import Process
+
+"""
+InputError is raised when an input file is malformed; its message includes the offending line number
+"""
+class InputError(ValueError):
+    pass
+
+"""
+the number of '|' separated fields on each process line
+"""
+NUM_FIELDS = 5
+
+"""
+SKIPPED_LINES matches the comment lines and whitespace-only lines which the reader ignores
+"""
+SKIPPED_LINES = re.compile(r"^(?:#[^\n]*|[^\S\n]*)\n", re.MULTILINE)
+
+"""
+the names of the numeric columns, for error messages
+"""
+COLUMN_NAMES = ("arrival time", "cpu burst time", "number of bursts", "i/o time")
+
+"""
+pause the cyclic garbage collector while bulk-allocating objects. None of the objects we create can form cycles, but
+allocating millions of them would otherwise trigger repeated full collections that each walk everything allocated so far
+"""
+@contextmanager
+def pausedGC():
+    wasEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if (wasEnabled):
+            gc.enable()
+
+"""
+read a file in large chunks, cutting each chunk at the end of its last whole line
+@param fileName: the file to read
+@param chunkSize: the number of bytes to read at a time
+@returns a generator yielding (block, lineNo) tuples, where block is a str of whole lines each ending in a newline and
+lineNo is the 1-based line number of its first line
+"""
+def iterBlocks(fileName, chunkSize=1 << 22):
+    lineNo = 1
+    carry = b""
+    with open(fileName, 'rb') as f:
+        while (True):
+            chunk = f.read(chunkSize)
+            if (not chunk):
+                break
+            data = carry + chunk
+            #the last line may continue into the next chunk, so hold it back
+            cut = data.rfind(b"\n") + 1
+            carry = data[cut:]
+            if (cut > 0):
+                block = data[:cut].decode()
+                yield block, lineNo
+                lineNo += block.count("\n")
+    if (carry):
+        yield carry.decode() + "\n", lineNo
+
+"""
+find the first malformed line in a block and describe it; only called once a block has failed validation
+@param block: the block of lines
+@param lineNo: the line number of the first line in the block
+@returns an InputError describing the first bad line
+"""
+def locateError(block, lineNo):
+    for i, line in enumerate(block.split("\n")):
+        row = line.strip()
+        if (not row or line[:1] == "#"):
+            continue
+        fields = row.split("|")
+        if (len(fields) != NUM_FIELDS):
+            return InputError("line {0}: expected {1} '|' separated fields but found {2}".format(lineNo + i, NUM_FIELDS, len(fields)))
+        for name, field in zip(COLUMN_NAMES, fields[1:]):
+            if (not field.isdigit()):
+                return InputError("line {0}: {1} {2!r} is not a non-negative integer".format(lineNo + i, name, field))
+    return InputError("line {0}: invalid process line".format(lineNo))
+
+"""
+parse and validate a block of lines in bulk. Rather than checking each field of each line, comments are removed with
+one regex pass, every line is checked for exactly four '|' separators with a single map, and each numeric column is
+joined into one string and checked for digits in one call. Only blocks with stray whitespace take the slower path of
+stripping each line first, and only if validation fails do we go back and find the offending line
+@param block: the block of lines, as yielded by iterBlocks
+@param lineNo: the line number of the first line in the block
+@returns a (pids, arrivalTimes, cpuBurstTimes, numBursts, ioTimes) tuple of a list of strs and four arrays of ints
+"""
+def parseBlock(block, lineNo):
+    #drop comments and blank lines in one pass, then strip each line only if there is any whitespace left to strip
+    rows = SKIPPED_LINES.sub("", block).split("\n")
+    #every line ends in a newline, so there is one empty string left over at the end
+    rows.pop()
+    if (any(c in block for c in " \t\r\f\v")):
+        rows = [row for row in map(str.strip, rows) if row != ""]
+    if (any(count != NUM_FIELDS - 1 for count in set(map(str.count, rows, repeat("|"))))):
+        raise locateError(block, lineNo)
+    #a block of only comments and blank lines has no columns to fill; joining no rows would still give one empty pid
+    if (not rows):
+        return ([],) + tuple(array('q') for _ in COLUMN_NAMES)
+    fields = "|".join(rows).split("|")
+    columns = [fields[k::NUM_FIELDS] for k in range(NUM_FIELDS)]
+    for column in columns[1:]:
+        #all() rejects empty fields, which would otherwise vanish from the join
+        if (column and not (all(column) and "".join(column).isdigit())):
+            raise locateError(block, lineNo)
+    try:
+        ints = [array('q', map(int, column)) for column in columns[1:]]
+    except OverflowError:
+        raise InputError("lines {0}-{1}: value too large".format(lineNo, lineNo + block.count("\n") - 1))
+    return (columns[0],) + tuple(ints)
+
+"""
+ProcessTable holds a whole workload column by column: a list of pids and compact arrays of ints, which takes a fraction
+of the memory of the equivalent Process objects and pickles quickly when handed to worker processes. The Simulator
+builds its own Process objects from it, and fcfsStats and hashProcesses read the columns directly
+"""
+class ProcessTable():
+    """
+    ProcessTable constructor: creates a new, empty table
+    """
+    def __init__(self):
+        self.pids = []
+        self.arrivalTimes = array('q')
+        self.cpuBurstTimes = array('q')
+        self.numBursts = array('q')
+        self.ioTimes = array('q')
+
+    """
+    append a parsed block of columns to the table
+    @param columns: a tuple of columns, as returned by parseBlock
+    """
+    def extend(self, columns):
+        for mine, theirs in zip(self.columns(), columns):
+            mine.extend(theirs)
+
+    """
+    get the columns of the table
+    @returns a (pids, arrivalTimes, cpuBurstTimes, numBursts, ioTimes) tuple, in the same form as parseBlock returns
+    """
+    def columns(self):
+        return (self.pids, self.arrivalTimes, self.cpuBurstTimes, self.numBursts, self.ioTimes)
+
+    def __len__(self):
+        return len(self.pids)
+
+    """
+    build a Process object for each row of the table
+    @returns a list of processes in file order
+    """
+    def processes(self):
+        with pausedGC():
+            return list(map(Process.fromFields, *self.columns()))
+
+"""
+load an entire input file into a ProcessTable
+@param fileName: the file to load
+@param chunkSize: the number of bytes to read at a time
+@returns the ProcessTable
+"""
+def loadTable(fileName, chunkSize=1 << 22):
+    table = ProcessTable()
+    with pausedGC():
+        for block, lineNo in iterBlocks(fileName, chunkSize):
+            table.extend(parseBlock(block, lineNo))
+    return table
+
+"""
+stream the processes from an input file one block at a time, without ever holding the whole workload in memory.
+The file must list processes in non-decreasing order of arrival time, as the simulator consumes them in that order
+@param fileName: the file to load
+@param chunkSize: the number of bytes to read at a time
+@returns a generator yielding processes in file (and arrival) order
+"""
+def iterProcesses(fileName, chunkSize=1 << 22):
+    lastArrival = 0
+    for block, lineNo in iterBlocks(fileName, chunkSize):
+        columns = parseBlock(block, lineNo)
+        arrivals = columns[1]
+        if (arrivals and (arrivals[0] < lastArrival or any(map(int.__gt__, arrivals, arrivals[1:])))):
+            raise InputError("lines {0}-{1}: processes must be listed in arrival order to be streamed".format(
+                lineNo, lineNo + block.count("\n") - 1))
+        if (arrivals):
+            lastArrival = arrivals[-1]
+        yield from map(Process.fromFields, *columns)
+
+"""
+feed a parsed process list into a hash, one line per process in the input file format
+@param processes: the processes being simulated, as a list or a ProcessTable
+@param h: the hashlib hash object to update
+@returns the updated hash object
+"""
+def hashProcesses(processes, h):
+    if (isinstance(processes, ProcessTable)):
+        rows = zip(*processes.columns())
+    else:
+        rows = ((p.pid, p.arrivalTime, p.cpuBurstTime, p.numBursts, p.ioTime) for p in processes)
+    for row in rows:
+        h.update("{0}|{1}|{2}|{3}|{4}\n".format(*row).encode())
+    return h
+
+"""
+hash a parsed process list, so results and saved state are only ever reused for the same workload
+@param processes: the processes being simulated, as a list or a ProcessTable
+@returns a short hex digest identifying the workload
+"""
+def inputHash(processes):
+    return hashProcesses(processes, hashlib.sha1()).hexdigest()[:16]
@@ -0,0 +1,322 @@
+import math
+from enum import Enum
+from ReadyQueue import FifoReadyQueue, SortedReadyQueue, SrtReadyQueue
+
+"""
+Algorithm is a simple enum containing each of the algorithms covered by our simulation
+"""
+class Algorithm(Enum):
+    FCFS = 1
+    SRT = 2
+    RR = 3
+    SJF = 4
+    MLFQ = 5
+    STRIDE = 6
+
+"""
+Policy is the base class of the scheduling policies. The Simulator asks its policy, chosen once when it is constructed,
+for everything that differs between algorithms: the ready queue structure, how long a process may run before its slice
+expires, and whether a newly ready process preempts a running one. The policy is also told when a slice expires or a
+burst finishes, so it can keep whatever per-process state it orders its queue by. The base class runs every burst to
+completion in arrival order
+"""
+class Policy():
+    #algorithm is the Algorithm this policy implements, which names it in the trace and stats
+    algorithm = None
+    #sliced marks the policies whose behaviour depends on t_slice
+    sliced = False
+    #requeueOnSliceExpiry puts a process back on the ready queue as soon as its slice expires, rather than once it has
+    #switched out, as the expected RR output requires; a policy which sets this must never preempt
+    requeueOnSliceExpiry = False
+
+    """
+    Policy constructor: creates a new policy
+    @param t_slice: the time (in milliseconds) for a single time-slice, for the policies which use one
+    """
+    def __init__(self, t_slice=70):
+        self.t_slice = t_slice
+
+    """
+    create a ready queue for this policy; there is one per core with per-core queues, and otherwise one shared by every core
+    @returns the new ready queue
+    """
+    def makeQueue(self):
+        return FifoReadyQueue()
+
+    """
+    get the time-slice for the specified process, which is about to start running
+    @param p: the process
+    @returns the time (in milliseconds) it may run before its slice expires, or None to run the rest of its burst
+    """
+    def quantum(self, p):
+        return None
+
+    """
+    called when a process arrives for the first time, before it is queued
+    @param sim: the simulator
+    @param p: the process which just arrived
+    @returns the core whose running process p should preempt, or None to queue p
+    """
+    def onArrive(self, sim, p):
+        return None
+
+    """
+    called when a process finishes its i/o, before it is queued
+    @param sim: the simulator
+    @param p: the process which just finished its i/o
+    @returns the core whose running process p should preempt, or None to queue p
+    """
+    def onFinishBlocked(self, sim, p):
+        return None
+
+    """
+    called when the slice of a running process expires, once its timeRemaining has been reduced by the slice
+    @param p: the process
+    @param used: the length of the slice
+    """
+    def onSliceExpired(self, p, used):
+        pass
+
+    """
+    called when a process finishes a cpu burst, once its numBursts has been reduced
+    @param p: the process
+    @param used: the time it ran for since it last switched in
+    """
+    def onBurstFinished(self, p, used):
+        pass
+
+    """
+    decide whether a process whose slice just expired should start another one rather than switch out
+    @param p: the process
+    @param queue: the ready queue of its core
+    @returns True to keep running p, otherwise False
+    """
+    def continuesSlice(self, p, queue):
+        return queue.empty()
+
+"""
+FcfsPolicy is first come first served, which is exactly the behaviour of the base class
+"""
+class FcfsPolicy(Policy):
+    algorithm = Algorithm.FCFS
+
+"""
+get the time a process running on a core had remaining when it was switched in, which SRT compares arrivals against
+@param core: the core to check
+@returns the running process's timeRemaining
+"""
+def switchedInTimeRemaining(core):
+    return core.running.timeRemaining
+
+"""
+SrtPolicy is shortest remaining time: the ready queue is ordered by timeRemaining, and a newly ready process preempts
+the running process with the most time left if it needs less than that
+"""
+class SrtPolicy(Policy):
+    algorithm = Algorithm.SRT
+
+    def makeQueue(self):
+        return SrtReadyQueue()
+
+    def onArrive(self, sim, p):
+        #as per the expected output, arrivals are compared against the time left when the running process switched in
+        return sim.findPreemptionTarget(p.cpuBurstTime, switchedInTimeRemaining)
+
+    def onFinishBlocked(self, sim, p):
+        return sim.findPreemptionTarget(p.timeRemaining, sim.runningTimeRemaining)
+
+"""
+RrPolicy is round robin: FCFS, except that a process is switched out when its slice expires if anything else is ready
+"""
+class RrPolicy(Policy):
+    algorithm = Algorithm.RR
+    sliced = True
+    requeueOnSliceExpiry = True
+
+    def quantum(self, p):
+        return self.t_slice
+
+"""
+SjfPolicy is non-preemptive shortest job first, ordering the ready queue by a prediction of each process's next burst:
+an exponential average of its previous bursts, tau = alpha * burst + (1 - alpha) * tau, rounded up to a whole millisecond.
+Every process starts from the same initial guess, tau0
+"""
+class SjfPolicy(Policy):
+    algorithm = Algorithm.SJF
+
+    """
+    SjfPolicy constructor: creates a new policy
+    @param t_slice: unused
+    @param alpha: the weight given to the latest burst in each prediction, between 0 and 1
+    @param tau0: the prediction (in milliseconds) for a process's first burst
+    """
+    def __init__(self, t_slice=70, alpha=0.5, tau0=100):
+        super().__init__(t_slice)
+        self.alpha = alpha
+        self.tau0 = tau0
+        #predictions maps each process which has finished a burst to the prediction for its next one
+        self.predictions = {}
+
+    def makeQueue(self):
+        return SortedReadyQueue(self.prediction)
+
+    """
+    get the predicted length of a process's next burst
+    @param p: the process
+    @returns the prediction (in milliseconds)
+    """
+    def prediction(self, p):
+        return self.predictions.get(p, self.tau0)
+
+    def onBurstFinished(self, p, used):
+        if (p.numBursts == 0):
+            self.predictions.pop(p, None)
+        else:
+            self.predictions[p] = math.ceil(self.alpha * p.cpuBurstTime + (1 - self.alpha) * self.prediction(p))
+
+"""
+MlfqPolicy is a multi-level feedback queue. Every process starts at level 0; each time it uses up a whole slice it drops
+a level, and the slice doubles with every level down, except on the bottom level where bursts run to completion. The
+ready queue runs the highest level first, and each level in arrival order, and a newly ready process preempts a process
+running on a lower level. A preempted process keeps its level and starts a fresh slice when it next runs
+"""
+class MlfqPolicy(Policy):
+    algorithm = Algorithm.MLFQ
+    sliced = True
+
+    """
+    MlfqPolicy constructor: creates a new policy
+    @param t_slice: the time-slice (in milliseconds) on level 0
+    @param numLevels: the number of levels
+    """
+    def __init__(self, t_slice=70, numLevels=3):
+        super().__init__(t_slice)
+        self.numLevels = numLevels
+        #levels maps each process which has been demoted to its level
+        self.levels = {}
+
+    def makeQueue(self):
+        return SortedReadyQueue(self.level, fifoTies=True)
+
+    """
+    get the level of a process
+    @param p: the process
+    @returns the level, where 0 is the highest
+    """
+    def level(self, p):
+        return self.levels.get(p, 0)
+
+    """
+    get the level of the process running on a core
+    @param core: the core to check
+    @returns the level
+    """
+    def runningLevel(self, core):
+        return self.level(core.running)
+
+    def quantum(self, p):
+        level = self.level(p)
+        return self.t_slice << level if level < self.numLevels - 1 else None
+
+    def onArrive(self, sim, p):
+        return sim.findPreemptionTarget(self.level(p), self.runningLevel)
+
+    def onFinishBlocked(self, sim, p):
+        return sim.findPreemptionTarget(self.level(p), self.runningLevel)
+
+    def onSliceExpired(self, p, used):
+        self.levels[p] = self.level(p) + 1
+
+    def onBurstFinished(self, p, used):
+        if (p.numBursts == 0):
+            self.levels.pop(p, None)
+
+    def continuesSlice(self, p, queue):
+        #only switch out for a process on the same level or higher
+        return queue.empty() or self.level(queue.peek()) > self.level(p)
+
+"""
+the tickets held by a process that StridePolicy has not been given a count for
+"""
+DEFAULT_TICKETS = 100
+
+"""
+StridePolicy is stride scheduling, the deterministic form of lottery scheduling: each process has a pass value, which
+advances by its stride (inversely proportional to its tickets) for every slice of cpu time it uses, and the ready queue
+runs the lowest pass first. A process joining the ready queue starts no lower than the pass of the last process charged,
+so time spent arriving or blocked on i/o is not banked
+"""
+class StridePolicy(Policy):
+    algorithm = Algorithm.STRIDE
+    sliced = True
+    #STRIDE1 is the stride of a process holding a single ticket
+    STRIDE1 = 1 << 20
+
+    """
+    StridePolicy constructor: creates a new policy
+    @param t_slice: the time-slice (in milliseconds)
+    @param tickets: a dict mapping pids to their number of tickets; any other process holds DEFAULT_TICKETS
+    """
+    def __init__(self, t_slice=70, tickets=None):
+        super().__init__(t_slice)
+        self.tickets = {} if tickets is None else tickets
+        #passes maps each process which is ready or running to its pass value
+        self.passes = {}
+        self.globalPass = 0
+
+    def makeQueue(self):
+        return SortedReadyQueue(self.passOf)
+
+    """
+    get the pass value of a process
+    @param p: the process
+    @returns the pass value
+    """
+    def passOf(self, p):
+        return self.passes[p]
+
+    def quantum(self, p):
+        return self.t_slice
+
+    def onArrive(self, sim, p):
+        self.passes[p] = max(self.passes.get(p, 0), self.globalPass)
+        return None
+
+    def onFinishBlocked(self, sim, p):
+        self.passes[p] = max(self.passes.get(p, 0), self.globalPass)
+        return None
+
+    """
+    advance the pass of a process in proportion to the cpu time it used
+    @param p: the process
+    @param used: the time (in milliseconds) it used
+    """
+    def charge(self, p, used):
+        current = self.passes[p]
+        self.globalPass = max(self.globalPass, current)
+        self.passes[p] = current + self.STRIDE1 // self.tickets.get(p.pid, DEFAULT_TICKETS) * used // self.t_slice
+
+    def onSliceExpired(self, p, used):
+        self.charge(p, used)
+
+    def onBurstFinished(self, p, used):
+        self.charge(p, used)
+        if (p.numBursts == 0):
+            del self.passes[p]
+
+    def continuesSlice(self, p, queue):
+        return queue.empty() or self.passes[queue.peek()] > self.passes[p]
+
+"""
+the policy class implementing each Algorithm
+"""
+POLICIES = {policy.algorithm: policy for policy in (FcfsPolicy, SrtPolicy, RrPolicy, SjfPolicy, MlfqPolicy, StridePolicy)}
+
+"""
+create the default policy for an algorithm
+@param algo: the Algorithm
+@param t_slice: the time-slice (in milliseconds), for the policies which use one
+@returns the new Policy
+"""
+def makePolicy(algo, t_slice=70):
+    return POLICIES[algo](t_slice)
@@ -11,6 +11,10 @@ class State(Enum):
 The Process class represents a single process on our CPU
 """
 class Process():
+    #use slots rather than a per-instance dict, as large workloads hold millions of processes
+    __slots__ = ("pid", "arrivalTime", "cpuBurstTime", "numBursts", "ioTime", "timeRemaining", "state", "totalBursts",
+                 "lastArrivalTime", "lastBurstArrivalTime", "finishEvent")
+
     """
     Process contructor: creates a new process with the specified properties
     @param id: the string ID given to the process by the input file; used for tie-breaking
@@ -40,7 +44,50 @@ class Process():
         self.lastArrivalTime = self.arrivalTime
         #lastBurstArrivalTime measures the last time this process entered the ready queue after completing a full cpu burst
         self.lastBurstArrivalTime = self.arrivalTime
+        #finishEvent is a handle to this process's pending FinishBurst or FinishSlice event, if it is currently running
+        self.finishEvent = None
                 
+    """
+    create a new process directly from already-parsed and validated int fields, skipping the string checks of the constructor
+    @param pid: the string ID of the process
+    @param arrivalTime: the arrival time, as an int
+    @param cpuBurstTime: the cpu burst time, as an int
+    @param numBursts: the number of cpu bursts, as an int
+    @param ioTime: the i/o time, as an int
+    @returns the new process
+    """
+    @classmethod
+    def fromFields(cls, pid, arrivalTime, cpuBurstTime, numBursts, ioTime):
+        p = cls.__new__(cls)
+        p.pid = pid
+        p.arrivalTime = p.lastArrivalTime = p.lastBurstArrivalTime = arrivalTime
+        p.cpuBurstTime = p.timeRemaining = cpuBurstTime
+        p.numBursts = p.totalBursts = numBursts
+        p.ioTime = ioTime
+        p.state = None
+        p.finishEvent = None
+        return p
+        
+    """
+    create a copy of this process for a new simulation run; this replaces copy.deepcopy, sharing the immutable input
+    columns and copying only the columns the simulator mutates
+    @returns the new process
+    """
+    def copy(self):
+        p = Process.__new__(Process)
+        p.pid = self.pid
+        p.arrivalTime = self.arrivalTime
+        p.cpuBurstTime = self.cpuBurstTime
+        p.ioTime = self.ioTime
+        p.totalBursts = self.totalBursts
+        p.numBursts = self.numBursts
+        p.timeRemaining = self.timeRemaining
+        p.state = self.state
+        p.lastArrivalTime = self.lastArrivalTime
+        p.lastBurstArrivalTime = self.lastBurstArrivalTime
+        p.finishEvent = None
+        return p
+        
     """
     override the less-than operator for priority queue sorting based on cpu burst time, using PID as a tie breaker
     @param other: the process we are comparing ourselves to
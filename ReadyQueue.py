@@ -0,0 +1,281 @@
+import bisect
+import heapq
+from operator import attrgetter, itemgetter
+from collections import deque
+
+"""
+FifoReadyQueue is the ready queue used by FCFS and RR: processes leave in the same order they arrived.
+The pid snapshot and rendered [Q ...] string are cached and only rebuilt the next time they are requested after the queue changes
+"""
+class FifoReadyQueue():
+    """
+    FifoReadyQueue constructor: creates a new, empty ready queue
+    """
+    def __init__(self):
+        self.procs = deque()
+        #snapshot and rendered cache the last pid tuple and [Q ...] string, or None if the queue has changed since they were built
+        self.snapshot = None
+        self.rendered = None
+
+    """
+    add a process to the back of the queue
+    @param p: the process to add
+    """
+    def put(self, p):
+        self.procs.append(p)
+        self.snapshot = self.rendered = None
+
+    """
+    remove and return the process at the front of the queue
+    @returns the next process to run
+    """
+    def get(self):
+        self.snapshot = self.rendered = None
+        return self.procs.popleft()
+
+    """
+    check whether the queue has any processes in it
+    @returns True if the queue is empty, otherwise False
+    """
+    def empty(self):
+        return not self.procs
+
+    def __len__(self):
+        return len(self.procs)
+
+    """
+    iterate over the queued processes in the order they will run
+    """
+    def __iter__(self):
+        return iter(self.procs)
+
+    """
+    get the pids of the queued processes in the order they will run
+    @returns a tuple of pids
+    """
+    def pids(self):
+        if (self.snapshot is None):
+            self.snapshot = tuple(p.pid for p in self.procs)
+        return self.snapshot
+
+    """
+    get the state of the ready queue in string form
+    @returns a string representing the contents of the ready queue
+    """
+    def render(self):
+        if (self.rendered is None):
+            pids = self.pids()
+            self.rendered = "[Q {0}]".format(" ".join(pids) if pids else "<empty>")
+        return self.rendered
+
+"""
+SortedReadyQueue is an addressable priority queue of processes, ordered by a key taken from each process when it is
+queued, so it is unaffected by later changes until update is called. Processes with equal keys are ordered by pid, with
+processes that share both leaving in the order they arrived, or purely in arrival order if fifoTies is set
+"""
+class SortedReadyQueue(FifoReadyQueue):
+    """
+    SortedReadyQueue constructor: creates a new, empty ready queue
+    @param keyOf: a function giving the sort key of a process; processes with the smallest key run first
+    @param fifoTies: order processes with equal keys by arrival alone, rather than by pid and then arrival
+    """
+    def __init__(self, keyOf, fifoTies=False):
+        self.keyOf = keyOf
+        self.fifoTies = fifoTies
+        #heap holds a (key, process) entry for every queued process, plus a tombstone for each one removed since
+        self.heap = []
+        #entries maps each queued process to its live key, so an entry in the heap is live only if its key is still there
+        self.entries = {}
+        #byPid maps each queued pid to the process most recently queued with it
+        self.byPid = {}
+        #seq orders processes with the same key (and pid) by arrival, and makes every key unique
+        self.seq = 0
+        #orderedKeys and orderedProcs hold the live entries in run order, or None until the queue is first displayed
+        self.orderedKeys = self.orderedProcs = None
+        self.snapshot = self.rendered = None
+
+    """
+    add a process to the queue
+    @param p: the process to add
+    """
+    def put(self, p):
+        self.seq += 1
+        key = (self.keyOf(p), self.seq) if self.fifoTies else (self.keyOf(p), p.pid, self.seq)
+        heapq.heappush(self.heap, (key, p))
+        self.entries[p] = key
+        self.byPid[p.pid] = p
+        if (self.orderedKeys is not None):
+            i = bisect.bisect_right(self.orderedKeys, key)
+            self.orderedKeys.insert(i, key)
+            self.orderedProcs.insert(i, p)
+        self.snapshot = self.rendered = None
+
+    """
+    pop any tombstones sitting at the top of the heap
+    """
+    def dropRemoved(self):
+        heap = self.heap
+        entries = self.entries
+        while (heap and entries.get(heap[0][1]) is not heap[0][0]):
+            heapq.heappop(heap)
+
+    """
+    remove and return the process with the smallest key
+    @returns the next process to run
+    """
+    def get(self):
+        self.dropRemoved()
+        key, p = heapq.heappop(self.heap)
+        self.forget(p)
+        if (self.orderedKeys is not None):
+            del self.orderedKeys[0]
+            del self.orderedProcs[0]
+        self.snapshot = self.rendered = None
+        return p
+
+    """
+    get the process with the smallest key without removing it
+    @returns the next process to run, or None if the queue is empty
+    """
+    def peek(self):
+        self.dropRemoved()
+        return self.heap[0][1] if self.heap else None
+
+    """
+    drop a process from the index, which turns its heap entry into a tombstone
+    @param p: the queued process
+    @returns the key it was queued with
+    """
+    def forget(self, p):
+        key = self.entries.pop(p)
+        if (self.byPid.get(p.pid) is p):
+            del self.byPid[p.pid]
+        return key
+
+    """
+    remove a queued process, wherever it is in the queue
+    @param p: the process to remove
+    """
+    def remove(self, p):
+        key = self.forget(p)
+        if (self.orderedKeys is not None):
+            i = bisect.bisect_left(self.orderedKeys, key)
+            del self.orderedKeys[i]
+            del self.orderedProcs[i]
+        self.snapshot = self.rendered = None
+
+    """
+    remove the queued process with the specified pid
+    @param pid: the pid of the process to remove
+    @returns the removed process
+    """
+    def removePid(self, pid):
+        p = self.byPid[pid]
+        self.remove(p)
+        return p
+
+    """
+    move a queued process to the position its current key calls for, e.g. after decreasing its timeRemaining. The process
+    goes behind any others it now shares a key with, as if it had just arrived
+    @param p: the process to move
+    """
+    def update(self, p):
+        self.remove(p)
+        self.put(p)
+
+    """
+    check whether a process with the specified pid is queued
+    @param pid: the pid to look for
+    """
+    def __contains__(self, pid):
+        return pid in self.byPid
+
+    """
+    check whether the queue has any processes in it
+    @returns True if the queue is empty, otherwise False
+    """
+    def empty(self):
+        return not self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    """
+    get the queued processes in the order they will run, building the ordered view if this is the first time it is needed
+    @returns a list of processes
+    """
+    def ordered(self):
+        if (self.orderedProcs is None):
+            live = sorted(self.entries.items(), key=itemgetter(1))
+            self.orderedKeys = [key for p, key in live]
+            self.orderedProcs = [p for p, key in live]
+        return self.orderedProcs
+
+    """
+    iterate over the queued processes in the order they will run
+    """
+    def __iter__(self):
+        return iter(self.ordered())
+
+    """
+    get the pids of the queued processes in the order they will run
+    @returns a tuple of pids
+    """
+    def pids(self):
+        if (self.snapshot is None):
+            self.snapshot = tuple(p.pid for p in self.ordered())
+        return self.snapshot
+
+"""
+SrtReadyQueue is the ready queue used by SRT: processes are ordered by (timeRemaining, pid), matching the order
+Process.__lt__ defines, with processes that share both leaving in the order they arrived
+"""
+class SrtReadyQueue(SortedReadyQueue):
+    """
+    SrtReadyQueue constructor: creates a new, empty ready queue
+    """
+    def __init__(self):
+        super().__init__(attrgetter("timeRemaining"))
+
+"""
+PerCoreReadyQueues is a read-only view over the ready queues of every core, used to show them all in the trace when
+each core has its own queue. Processes are added to and taken from the individual queues, never through the view
+"""
+class PerCoreReadyQueues():
+    """
+    PerCoreReadyQueues constructor: creates a view over the specified queues
+    @param queues: the ready queue of each core, in core order
+    """
+    def __init__(self, queues):
+        self.queues = queues
+
+    """
+    check whether every queue is empty
+    @returns True if no core has any processes queued, otherwise False
+    """
+    def empty(self):
+        return all(q.empty() for q in self.queues)
+
+    def __len__(self):
+        return sum(len(q) for q in self.queues)
+
+    """
+    iterate over the queued processes of each core in turn
+    """
+    def __iter__(self):
+        for q in self.queues:
+            yield from q
+
+    """
+    get the pids of the queued processes of each core in turn
+    @returns a tuple of pids
+    """
+    def pids(self):
+        return sum((q.pids() for q in self.queues), ())
+
+    """
+    get the state of every core's ready queue in string form
+    @returns a string such as "[Q0 A B] [Q1 <empty>]"
+    """
+    def render(self):
+        return " ".join("[Q{0} {1}".format(i, q.render()[3:]) for i, q in enumerate(self.queues))
@@ -0,0 +1,120 @@
+import os
+import json
+import zlib
+import hashlib
+from Simulator import SIMULATOR_VERSION
+from Loader import hashProcesses
+from Checkpoint import writeAtomically
+
+"""
+get the digest identifying a workload in cache keys
+@param processes: the processes being simulated
+@returns the sha256 hex digest of the parsed process list
+"""
+def workloadDigest(processes):
+    return hashProcesses(processes, hashlib.sha256()).hexdigest()
+
+"""
+get the cache key for a single simulation: everything that determines its trace and stats
+@param workload: the workload digest, as returned by workloadDigest
+@param algo: the algorithm simulated
+@param t_cs: the context switch time
+@param t_slice: the time-slice, for the algorithms which use one
+@returns the sha256 hex digest of the workload, parameters and SIMULATOR_VERSION
+"""
+def resultKey(workload, algo, t_cs=8, t_slice=70):
+    params = "v{0}|{1}|{2}|{3}|{4}".format(SIMULATOR_VERSION, workload, algo.name, t_cs, t_slice)
+    return hashlib.sha256(params.encode()).hexdigest()
+
+"""
+ResultCache is an on-disk, content-addressed store of simulation results. Each entry is a small JSON file holding the
+stats block, plus an optional zlib-compressed trace beside it. A hit refreshes the entry's modification time, and once
+the cache grows past its size bound the least recently used entries are removed
+"""
+class ResultCache():
+    """
+    ResultCache constructor: opens (and if necessary creates) a cache directory
+    @param directory: the directory to keep the cache in; it may be shared by any number of runs
+    @param maxBytes: the size the cache is trimmed back to after each new entry
+    """
+    def __init__(self, directory, maxBytes=1 << 30):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        os.makedirs(directory, exist_ok=True)
+
+    """
+    get the file names for an entry
+    @param key: the entry's key, as returned by resultKey
+    @returns a (statsName, traceName) tuple
+    """
+    def entryNames(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".trace.z"
+
+    """
+    look up a result
+    @param key: the key of the result, as returned by resultKey
+    @param needTrace: whether the trace is wanted as well as the stats; an entry stored without a trace is then a miss
+    @returns a (trace, stats) tuple of strings, with trace None unless it was needed, or None on a miss
+    """
+    def get(self, key, needTrace=True):
+        statsName, traceName = self.entryNames(key)
+        try:
+            with open(statsName) as f:
+                entry = json.load(f)
+            trace = None
+            if (needTrace):
+                with open(traceName, 'rb') as f:
+                    trace = zlib.decompress(f.read()).decode()
+            #mark the entry as recently used
+            os.utime(statsName)
+        except (OSError, ValueError, zlib.error):
+            #a missing, partly evicted or corrupt entry is simply a miss
+            return None
+        return trace, entry["stats"]
+
+    """
+    store a result, then evict the least recently used entries if the cache has grown too large
+    @param key: the key of the result, as returned by resultKey
+    @param trace: the trace, or None to store only the stats
+    @param stats: the stats block
+    """
+    def put(self, key, trace, stats):
+        statsName, traceName = self.entryNames(key)
+        #the trace goes first, so an entry is never visible without a trace it claims to have
+        if (trace != None):
+            writeAtomically(traceName, zlib.compress(trace.encode()))
+        writeAtomically(statsName, json.dumps({"version": SIMULATOR_VERSION, "stats": stats, "trace": trace != None}).encode())
+        self.evict()
+
+    """
+    remove the least recently used entries until the cache fits within maxBytes
+    @returns the number of entries removed
+    """
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if (not name.endswith(".json")):
+                continue
+            statsName, traceName = self.entryNames(name[:-len(".json")])
+            try:
+                lastUsed = os.path.getmtime(statsName)
+                size = os.path.getsize(statsName) + (os.path.getsize(traceName) if os.path.exists(traceName) else 0)
+            except OSError:
+                #another run evicted it first
+                continue
+            entries.append((lastUsed, size, statsName, traceName))
+            total += size
+        removed = 0
+        for lastUsed, size, statsName, traceName in sorted(entries):
+            if (total <= self.maxBytes):
+                break
+            for name in (statsName, traceName):
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
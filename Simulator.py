@@ -1,18 +1,20 @@
 from enum import Enum
-import queue
+from collections import namedtuple
+from itertools import groupby
+from operator import attrgetter
 from Process import State
-import copy
-import os
-import sys
+from EventQueue import HeapEventQueue
+from ReadyQueue import PerCoreReadyQueues
+from Policy import Algorithm, Policy, makePolicy
+from Trace import TraceKind, TextTraceSink, NullTraceSink
+from Loader import ProcessTable
 
 """
-Algorithm is a simple enum containing each of the algorithms covered by our simulation
+the version of the results the simulator produces; bump it with any change that alters a trace or stats, so results
+cached by an older version are never reused
 """
-class Algorithm(Enum):
-    FCFS = 1
-    SRT = 2
-    RR = 3
-   
+SIMULATOR_VERSION = 2
+
 """
 EventType is a simple enum containing each of the potential EventTypes that may occur in our simulation
 """ 
@@ -28,16 +30,24 @@ class EventType(Enum):
 the event class is responsible for holding information about events that will occur at calculated points in time
 """
 class Event():
+    __slots__ = ("eType", "time", "process", "priority", "cancelled", "core")
+
     """
     event constructor: create a new event with the specified time, type, and process
     @param type: the EventType for this event
     @param time: the time (in milliseconds) at which this event will occur
     @param proc: the process to which this event corresponds
+    @param core: the Core on which this event occurs, for events that happen on a CPU rather than in the ready queue or i/o
     """
-    def __init__(self,eType,time,proc):
+    def __init__(self,eType,time,proc,core=None):
         self.eType = eType
         self.time = time
         self.process = proc
+        self.core = core
+        #cache the enum value so the event queue can order events without going through the Enum on every comparison
+        self.priority = eType.value
+        #cancelled marks this event as a tombstone which the event queue will skip rather than process
+        self.cancelled = False
     
     """
     override the less-than operator for priority queue sorting based on event time
@@ -48,130 +58,347 @@ class Event():
         if (self.time != other.time):
             return self.time < other.time
         #when time is the same, we compare event priority
-        if (self.eType != other.eType):
-            return self.eType.value < other.eType.value
+        if (self.priority != other.priority):
+            return self.priority < other.priority
         #when events are the same, we compare PID
         return self.process.pid < other.process.pid
 
+"""
+the Core class holds the run state of a single CPU: the process using it, its pending context switches, and the ready
+queue it pulls from (which is shared by every core unless each core has its own)
+"""
+class Core():
+    __slots__ = ("index", "running", "readyQueue", "switchInEvent", "switchOutEndTime", "contextSwitches")
+
+    """
+    core constructor: create a new idle core
+    @param index: the number of this core, starting from 0
+    @param readyQueue: the ready queue this core pulls processes from
+    """
+    def __init__(self, index, readyQueue):
+        self.index = index
+        #running holds the process which is currently using (or switching into) this core
+        self.running = None
+        self.readyQueue = readyQueue
+        #switchInEvent is a handle to the pending SwitchIn event of running, if it has not finished switching in yet
+        self.switchInEvent = None
+        #switchOutEndTime holds the time at which the latest pending switch out completes, so we never need to search the event queue for it
+        self.switchOutEndTime = 0
+        self.contextSwitches = 0
+
+"""
+Stats holds the summary statistics for a single simulation run, as written by outputStats
+"""
+Stats = namedtuple("Stats", ["algorithm", "avgBurstTime", "avgWaitTime", "avgTurnaroundTime", "totalContextSwitches",
+                             "totalPreemptions", "truncated", "cpuContextSwitches", "maxTurnaroundTime"])
+
+"""
+format summary statistics in the form they are written to the output file
+@param stats: the Stats tuple to format, with every average already rounded to 2 decimal places
+@returns the stats block for the algorithm
+"""
+def formatStats(stats):
+    return ("Algorithm {0}\n".format(stats.algorithm) +
+        "-- average CPU burst time: {0:.2f} ms\n".format(stats.avgBurstTime) +
+        "-- average wait time: {0:.2f} ms\n".format(stats.avgWaitTime) +
+        "-- average turnaround time: {0:.2f} ms\n".format(stats.avgTurnaroundTime) +
+        "-- total number of context switches: {0}\n".format(stats.totalContextSwitches) +
+        #with more than one CPU, break the context switches down by CPU
+        "".join("-- context switches on CPU {0}: {1}\n".format(i, n) for i, n in enumerate(stats.cpuContextSwitches)
+                if len(stats.cpuContextSwitches) > 1) +
+        "-- total number of preemptions: {0}\n".format(stats.totalPreemptions))
+
 """
 The Simulator class is responsible for emulating our CPU, Running through the input processes using the selected algorithm
 """
 class Simulator():
     """
-    Simulator constructor: creates a new simulator with the specified algorithm and input processes, then runs the simulation
-    @param algo: the algorithm that this simulator should use when executing the processes
-    @param _processes: the processes that should be executed by the simulator
-    """
-    def __init__(self,algo,processes):
-        #algo contains the selected algorithm from our enum
-        self.algo = algo
+    Simulator constructor: creates a new simulator with the specified algorithm and input processes, ready to run
+    @param algo: the algorithm that this simulator should use when executing the processes; either an Algorithm, which
+                 uses its default Policy, or a Policy instance with its own parameters
+    @param _processes: the processes that should be executed by the simulator; either a list, a Loader.ProcessTable, or any
+                       other iterable (such as Loader.iterProcesses) yielding processes in arrival order, which is consumed
+                       as the simulation runs
+    @param eventQueue: the event engine class to use, such as HeapEventQueue or CalendarEventQueue
+    @param trace: the trace sink which receives every logged line; defaults to a TextTraceSink on standard output
+    @param statsOutput: an optional text stream to write our stats block to once the simulation finishes
+    @param t_cs: the context switch time (in milliseconds)
+    @param t_slice: the time (in milliseconds) for a single time-slice, for the algorithms which use one; a Policy passed
+                    as algo keeps its own
+    @param maxTime: if given, stop the simulation early once the next event would occur after this time
+    @param instrumentation: an optional Instrumentation to collect counters, timings and high-water marks; None costs nothing
+    @param numCpus: the number of CPUs to simulate
+    @param perCoreQueues: give each CPU its own ready queue, with idle CPUs stealing work from the longest other queue,
+                          rather than sharing a single ready queue between all of them
+    @param checkpoint: an optional Checkpointer which periodically saves the full simulator state so the run can be resumed
+    """
+    def __init__(self,algo,processes,eventQueue=HeapEventQueue,trace=None,statsOutput=None,t_cs=8,t_slice=70,maxTime=None,
+                 instrumentation=None,numCpus=1,perCoreQueues=False,checkpoint=None):
+        #policy makes every scheduling decision that differs between algorithms, and algo names it
+        self.policy = algo if isinstance(algo, Policy) else makePolicy(algo, t_slice)
+        self.algo = self.policy.algorithm
         #processes defines a List of all processes that were sent to our CPU
-        self.processes = copy.deepcopy(processes)
-        #hard-coded context switch time (in milliseconds) as specified in the project requirements
-        self.t_cs = 8
-        #hard-coded time (in milliseconds) for a single time-slice
-        self.t_slice = 70
+        if (isinstance(processes, ProcessTable)):
+            self.processes = processes.processes()
+            self.arrivals = None
+        elif (isinstance(processes, (list, tuple))):
+            self.processes = [p.copy() for p in processes]
+            self.arrivals = None
+        else:
+            #arrivals streams the processes one arrival time at a time, so the whole workload is never held in memory
+            self.processes = []
+            self.arrivals = groupby(processes, key=attrgetter("arrivalTime"))
+            #nextArrivalTime is the arrival time of the group of processes currently waiting in the event queue
+            self.nextArrivalTime = None
+        #trace receives our event log; a NullTraceSink skips all formatting
+        self.trace = TextTraceSink() if trace is None else trace
+        #context switch time (in milliseconds); the project requirements specify 8
+        self.t_cs = t_cs
+        #time (in milliseconds) for a single time-slice; the project requirements specify 70
+        self.t_slice = t_slice
+        #maxTime cuts the simulation off early, leaving truncated set if any events were left unprocessed
+        self.maxTime = maxTime
+        self.truncated = False
         #number of processes to simulate - stored in a static variable as specified in the project requirements
         self.n = len(self.processes)
+        #numTerminated counts the processes that have finished all of their bursts
+        self.numTerminated = 0
         #t stores the current time (in milliseconds) and is iterated for each step of the simulation
         self.t = 0
-        #ReadyQueue defines a Queue of processes in the Ready state (able to begin their CPU burst)
-        self.ReadyQueue = queue.Queue()
-        #currRunning holds the process which is currently using the CPU
-        self.currRunning = None
         #maintain a queue of events so we only need to iterate to happenings rather than going over each and every ms 
-        self.events = queue.PriorityQueue()
+        self.events = eventQueue()
         
-        #initialize the ReadyQueue depending on the selected algorithm
-        if (self.algo == Algorithm.SRT):
-            self.ReadyQueue = queue.PriorityQueue() 
+        #ReadyQueue defines a Queue of processes in the Ready state (able to begin their CPU burst), built by the policy
+        queueType = self.policy.makeQueue
+        #cores holds the run state of each CPU; with per-core queues, ReadyQueue is a view over all of them for display
+        self.numCpus = numCpus
+        self.perCoreQueues = perCoreQueues and numCpus > 1
+        if (self.perCoreQueues):
+            self.cores = [Core(i, queueType()) for i in range(numCpus)]
+            self.ReadyQueue = PerCoreReadyQueues([core.readyQueue for core in self.cores])
+        else:
+            self.ReadyQueue = queueType()
+            self.cores = [Core(i, self.ReadyQueue) for i in range(numCpus)]
             
         #initialize stat counters
-        #store the total number of bursts for use in averaging
+        #store the total number of bursts for use in averaging; streamed processes are counted as they are read in
         self.totalBursts =  sum(b.numBursts for b in self.processes)
         #burst time can be calculated by simply averaging the input burst times
-        self.avgBurstTime = sum(b.cpuBurstTime * b.numBursts for b in self.processes) / self.totalBursts
-             
-        self.avgWaitTime = 0
-        self.avgTurnaroundTime = 0
+        self.totalBurstTime = sum(b.cpuBurstTime * b.numBursts for b in self.processes)
+        #wait and turnaround times are summed as we go, and only averaged when the stats are requested
+        self.totalWaitTime = 0
+        self.totalTurnaroundTime = 0
+        #completedBursts counts the bursts whose turnaround has been summed, and startedBursts holds each process whose
+        #current burst has been dispatched but not finished, so a run cut off by maxTime averages over the bursts it covers
+        self.completedBursts = 0
+        self.startedBursts = set()
+        #maxTurnaroundTime is the longest turnaround of any single burst, for comparing the tails of different policies
+        self.maxTurnaroundTime = 0
         self.totalContextSwitches = 0
         self.totalPreemptions = 0
+        #numEvents counts the events processed, for throughput measurements
+        self.numEvents = 0
         
-        #begin the simulation
-        self.run()
-        
-        #upon simulation completion, output runtime statistics
-        self.outputStats()
+        #handlers maps each EventType value to the method that processes it, so dispatch is a single lookup
+        self.handlers = self.buildHandlers()
+        #instrumentation swaps in wrapped handlers, leaving the uninstrumented path untouched
+        self.instrumentation = instrumentation
+        if (instrumentation != None):
+            instrumentation.attach(self)
+        #checkpoint is consulted once per time step; a streamed workload cannot be saved, as its source is not part of our state
+        if (checkpoint != None and self.arrivals != None):
+            raise ValueError("checkpoints need a list of processes rather than a stream")
+        self.checkpoint = checkpoint
+        self.statsOutput = statsOutput
+        #started and finished track where we are, so run, step and runUntil can be freely mixed
+        self.started = False
+        self.finished = False
         
     """
-    output runtime statistics to the specified output file
-    """
-    def outputStats(self):
-        fName = sys.argv[2]
-        fMode = 'a' if os.path.exists(fName) else 'w'
-        with open(fName,fMode) as f:
-            f.write("Algorithm {0}\n".format(self.algo.name))
-            #round all numbers to 2 decimal places
-            f.write("-- average CPU burst time: {0:.2f} ms\n".format(round(self.avgBurstTime,2)))
-            f.write("-- average wait time: {0:.2f} ms\n".format(round(self.avgWaitTime,2)))
-            f.write("-- average turnaround time: {0:.2f} ms\n".format(round(self.avgTurnaroundTime,2)))
-            f.write("-- total number of context switches: {0}\n".format(self.totalContextSwitches))
-            f.write("-- total number of preemptions: {0}\n".format(self.totalPreemptions))
+    build the table mapping each EventType's value to the method that processes it. It is keyed by the int each event
+    caches as its priority, since hashing an int is far cheaper than hashing the EventType itself
+    @returns the handler table
+    """
+    def buildHandlers(self):
+        return {
+            EventType.Arrive.value: self.handleArrive,
+            EventType.SwitchIn.value: self.handleSwitchIn,
+            EventType.SwitchOut.value: self.handleSwitchOut,
+            EventType.FinishBlocked.value: self.handleFinishBlocked,
+            EventType.FinishBurst.value: self.handleFinishBurst,
+            EventType.FinishSlice.value: self.handleFinishSlice,
+        }
+
+    """
+    get the state to save in a checkpoint: everything except the trace sink, checkpointer, instrumentation and handler
+    table, which belong to the run rather than the simulation and are supplied again on resume
+    @returns a dict of our attributes
+    """
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for k in ("trace", "statsOutput", "checkpoint", "instrumentation", "handlers", "updateReadyQueue"):
+            state.pop(k, None)
+        return state
+
+    """
+    restore the state saved by __getstate__, with tracing off and no checkpointer until the caller supplies them
+    @param state: the saved dict of attributes
+    """
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.trace = NullTraceSink()
+        self.statsOutput = None
+        self.checkpoint = None
+        self.instrumentation = None
+        self.handlers = self.buildHandlers()
+
+    """
+    output runtime statistics to the specified stream
+    @param out: the text stream to write our stats block to
+    """
+    def outputStats(self, out):
+        out.write(self.statsString())
+            
+    """
+    get our runtime statistics, rounded to 2 decimal places as they are written to the output file. These are final once
+    the simulation has finished, and cover the events processed so far before then: the average wait time is taken over
+    the bursts dispatched so far, and the average turnaround time over the bursts completed so far, which are every burst
+    once the simulation has run to completion. The average burst time is always that of the whole workload
+    @returns a Stats tuple for this run
+    """
+    def stats(self):
+        bursts = self.totalBursts or 1
+        dispatchedBursts = self.completedBursts + len(self.startedBursts) or 1
+        completedBursts = self.completedBursts or 1
+        return Stats(self.algo.name, round(self.totalBurstTime / bursts, 2), round(self.totalWaitTime / dispatchedBursts, 2),
+                     round(self.totalTurnaroundTime / completedBursts, 2), self.totalContextSwitches, self.totalPreemptions,
+                     self.truncated, tuple(c.contextSwitches for c in self.cores), self.maxTurnaroundTime)
+            
+    """
+    get our runtime statistics in the same form they are written to the output file
+    @returns the stats block for this algorithm
+    """
+    def statsString(self):
+        return formatStats(self.stats())
         
     """
     show the stop message when this algorithm begins
     """
     def showStartMessage(self):
         #remove 'Algorithm.' from the algorithm name
-        print("time {0}ms: Simulator started for {1} {2}".format(self.t, self.algo.name, self.queueString())) 
+        self.log(TraceKind.Start, None, self.algo.name)
         
     """
     show the stop message when this algorithm finishes
     """
     def showStopMessage(self):
         #remove 'Algorithm.' from the algorithm name
-        print("time {0}ms: Simulator ended for {1}".format(self.t,self.algo.name),end='')
+        self.log(TraceKind.Stop, None, self.algo.name)
+        self.trace.flush()
+        
+    """
+    send a line to the trace sink; nothing is formatted or rendered unless the sink is enabled
+    @param kind: the TraceKind of the line
+    @param pid: the pid of the process the line refers to, or None
+    @param arg: the extra argument for the line (another pid, a time or a count), or None
+    @param core: the core the line refers to, or None; this is only shown when there is more than one CPU
+    """
+    def log(self, kind, pid, arg=None, core=None):
+        if (self.trace.enabled):
+            self.trace.write(self.t, kind, pid, arg, self.ReadyQueue, core.index if core != None and self.numCpus > 1 else None)
         
     """
     add an event with the specified time and type for the specified process to the event queue
     @param eventType: the type of event to add
     @param time: the time at which the event will occur
     @param process: the process to which the event corresponds
+    @param core: the core on which the event occurs, if any
+    @returns the newly added event, which may be used as a handle for cancelling it later
     """
-    def addEvent(self,eventType, time, process):
-        self.events.put(Event(eventType,time,process))
+    def addEvent(self,eventType, time, process, core=None):
+        event = Event(eventType,time,process,core)
+        self.events.put(event)
+        return event
     
-    """preempt the running process, switching it with the current process
-    @param event: the event corresponding to the process which will preempt the running process
     """
-    def preempt(self, event):        
+    add a switch out event for the specified process, starting now, and remember when its core will be free again
+    @param core: the core the process is switching out of
+    @param process: the process which is switching out
+    """
+    def addSwitchOutEvent(self, core, process):
+        self.addEvent(EventType.SwitchOut, self.t + self.t_cs//2, process, core)
+        core.switchOutEndTime = max(core.switchOutEndTime, self.t + self.t_cs//2)
+    
+    """preempt the process running on the specified core, switching it with the specified process. If the running process
+    is still switching in, its switch-in is cancelled: it never starts, no context switch is counted for it, and its wait
+    is counted again once it is back in the ready queue
+    @param core: the core whose running process will be preempted
+    @param p: the process which will preempt the running process
+    """
+    def preempt(self, core, p):
+        old = core.running
         #switch the current running process out and the preempting process in
-        self.addEvent(EventType.SwitchOut, self.t + self.t_cs//2, self.currRunning)
-        self.addEvent(EventType.SwitchIn, self.t + self.t_cs, event.process)
-        #remove the finishBurst event corresponding to the current process since it has been preempted
-        for e in self.events.queue:
+        self.addSwitchOutEvent(core, old)
+        #if the current process has not finished switching in yet, it never gets to start
+        if (core.switchInEvent != None):
+            self.events.cancel(core.switchInEvent)
+        core.switchInEvent = self.addEvent(EventType.SwitchIn, self.t + self.t_cs, p, core)
+        #cancel the finish event corresponding to the current process since it has been preempted
+        e = old.finishEvent
+        if (e != None):
+            #update the time remaining for our running event to reflect the actual time left, then cancel the finish event
             if (e.eType == EventType.FinishBurst):
-                #update the time remaining for our running event to reflect the actual time left, then remove the finish event
-                self.currRunning.timeRemaining = e.time - self.t
-                self.events.queue.remove(e)
-                break
+                old.timeRemaining = e.time - self.t
+            else:
+                #only the part of the slice before now has been used
+                old.timeRemaining -= self.policy.quantum(old) - (e.time - self.t)
+            self.events.cancel(e)
+            old.finishEvent = None
             
-        #now set currRunning to the preempting event
-        self.currRunning = event.process
+        #now set the core's running process to the preempting process
+        core.running = p
+        self.startedBursts.add(p)
         
         #update number of preemptions
         self.totalPreemptions += 1
+        
+    """
+    find the core a newly ready process should preempt: the one whose running process has the most time remaining (or
+    whatever else the policy ranks by), provided that is more than the new process needs. Nothing is preempted while any
+    core is free to take the new process
+    @param remaining: the time the new process needs
+    @param timeRemainingOf: a function giving the time remaining for the process running on a core
+    @returns the core to preempt, or None
+    """
+    def findPreemptionTarget(self, remaining, timeRemainingOf):
+        target = None
+        for core in self.cores:
+            if (core.running == None):
+                return None
+            if (target == None or timeRemainingOf(core) > timeRemainingOf(target)):
+                target = core
+        return target if remaining < timeRemainingOf(target) else None
+        
+    """
+    get the ready queue a newly ready process should join: the shared queue, or the shortest per-core queue
+    @returns the ready queue
+    """
+    def arrivalQueue(self):
+        if (not self.perCoreQueues):
+            return self.ReadyQueue
+        return min((core.readyQueue for core in self.cores), key=len)
   
     """
-    add either a FinishSlice event or a FinishBurst event, depending on the current algo and the time remaining in the corresponding process
+    add either a FinishSlice event or a FinishBurst event, depending on the policy's time-slice and the time remaining in the corresponding process
     @param event: the event we are currently processing
     """      
     def addProcessFinishEvent(self, event):
-        #if we are in Round Robin mode and the time slice is less than the process remaining time, we interrupt after the timeslice
-        if (self.algo == Algorithm.RR and self.t_slice < event.process.timeRemaining):
-            self.addEvent(EventType.FinishSlice, self.t + self.t_slice, event.process)
+        #if the policy gives a time slice less than the process remaining time, we interrupt after the timeslice
+        quantum = self.policy.quantum(event.process)
+        if (quantum != None and quantum < event.process.timeRemaining):
+            event.process.finishEvent = self.addEvent(EventType.FinishSlice, self.t + quantum, event.process, event.core)
         else:
-            self.addEvent(EventType.FinishBurst, self.t + event.process.timeRemaining, event.process)   
+            event.process.finishEvent = self.addEvent(EventType.FinishBurst, self.t + event.process.timeRemaining, event.process, event.core)
     
     """
     when a process arrives, display that information and either add it to the ready queue or preempt the running process
@@ -179,64 +406,80 @@ class Simulator():
     """
     def handleArrive(self,event):
         p = event.process
-        if (self.algo == Algorithm.SRT and self.currRunning != None and p.cpuBurstTime < self.currRunning.timeRemaining):
-            print("time {0}ms: Process {1} arrived and will preempt {2} {3}".format(self.t, p.pid, self.currRunning.pid, self.queueString()))
-            self.preempt(event)
+        #when streaming, the first arrival of the pending group is our cue to read in the next group
+        if (self.arrivals != None and p.arrivalTime == self.nextArrivalTime):
+            self.scheduleNextArrivals()
+        core = self.policy.onArrive(self, p)
+        if (core != None):
+            self.log(TraceKind.ArrivePreempt, p.pid, core.running.pid, core)
+            self.preempt(core, p)
         else:
-            self.ReadyQueue.put(p)
+            self.arrivalQueue().put(p)
             p.lastArrivalTime = self.t
-            print("time {0}ms: Process {1} arrived and added to ready queue {2}".format(self.t, p.pid, self.queueString()))
+            self.log(TraceKind.Arrive, p.pid)
             
     """
-    when a process finishes its timeslice, add a switch out event unless there are no processes on the ready queue
+    when a process finishes its timeslice, add a switch out event unless the policy lets it take another
     @param event: the event containing information about the process that just finished its time slice
     """
     def handleFinishSlice(self,event):
-        self.currRunning.timeRemaining -= self.t_slice
-        #if there are no processes in the ready queue, we take the next time slice
-        if (self.ReadyQueue.empty()):
-            print("time {0}ms: Time slice expired; no preemption because ready queue is empty {1}".format(
-                self.t,self.queueString()))
+        core = event.core
+        running = core.running
+        running.finishEvent = None
+        used = self.policy.quantum(running)
+        running.timeRemaining -= used
+        self.policy.onSliceExpired(running, used)
+        #if there are no processes in the ready queue that should go first, we take the next time slice
+        if (self.policy.continuesSlice(running, core.readyQueue)):
+            self.log(TraceKind.SliceExpired, running.pid, None, core)
             self.addProcessFinishEvent(event)
         else:
-            print("time {0}ms: Time slice expired; process {1} preempted with {2}ms to go {3}".format(
-                self.t,self.currRunning.pid,self.currRunning.timeRemaining, self.queueString()))
+            self.log(TraceKind.SlicePreempt, running.pid, running.timeRemaining, core)
         
             #add an event for when the current process is done switching out
-            self.addEvent(EventType.SwitchOut, self.t + self.t_cs//2, self.currRunning)
-            self.currRunning.state = State.Blocked
-            #add this process back to the ready queue right away as per the expected output
-            self.ReadyQueue.put(self.currRunning)
+            self.addSwitchOutEvent(core, running)
+            running.state = State.Blocked
+            #with RR, add this process back to the ready queue right away as per the expected output
+            if (self.policy.requeueOnSliceExpiry):
+                core.readyQueue.put(running)
             
             #finally, update the current running process to indicate that nothing is running
-            self.currRunning = None
+            core.running = None
             
             #update number of preemptions stat
             self.totalPreemptions += 1
     
     """
     when a process finishes its burst, add a switch out event
-    """
-    def handleFinishBurst(self):
-        self.currRunning.timeRemaining = 0
-        self.currRunning.numBursts-=1
-        if (self.currRunning.numBursts == 0):
-            print("time {0}ms: Process {1} terminated {2}".format(self.t, self.currRunning.pid, self.queueString()))
+    @param event: the event containing information about the process that just finished its burst
+    """
+    def handleFinishBurst(self,event):
+        core = event.core
+        running = core.running
+        running.finishEvent = None
+        running.numBursts-=1
+        self.policy.onBurstFinished(running, running.timeRemaining)
+        running.timeRemaining = 0
+        if (running.numBursts == 0):
+            self.log(TraceKind.Terminate, running.pid, None, core)
         else:
-            print("time {0}ms: Process {1} completed a CPU burst; {2} burst{3} to go {4}".format( 
-                    self.t, self.currRunning.pid, self.currRunning.numBursts, "" if self.currRunning.numBursts==1 else "s", self.queueString()))
-            print("time {0}ms: Process {1} switching out of CPU; will block on I/O until time {2}ms {3}".format( 
-                    self.t, self.currRunning.pid, self.t+self.t_cs//2+self.currRunning.ioTime, self.queueString()))
+            self.log(TraceKind.BurstComplete, running.pid, running.numBursts, core)
+            self.log(TraceKind.BlockOnIO, running.pid, self.t+self.t_cs//2+running.ioTime, core)
         
         #add an event for when the current process is done switching out
-        self.addEvent(EventType.SwitchOut, self.t + self.t_cs//2, self.currRunning)
-        self.currRunning.state = State.Blocked
+        self.addSwitchOutEvent(core, running)
+        running.state = State.Blocked
         
         #update turnaround time now that this process has finished a cpu burst, and include half of the context switch time to factor in the switch out
-        self.avgTurnaroundTime += (self.t - self.currRunning.lastBurstArrivalTime + self.t_cs//2)
+        turnaroundTime = self.t - running.lastBurstArrivalTime + self.t_cs//2
+        self.totalTurnaroundTime += turnaroundTime
+        self.completedBursts += 1
+        self.startedBursts.discard(running)
+        if (turnaroundTime > self.maxTurnaroundTime):
+            self.maxTurnaroundTime = turnaroundTime
         
         #finally, update the current running process to indicate that nothing is running
-        self.currRunning = None
+        core.running = None
         
     """
     when a process finishes switching out, add an io block event
@@ -245,7 +488,7 @@ class Simulator():
     def handleSwitchOut(self, event):
         #once all bursts are finished, after switching out, the process should be destroyed
         if (event.process.numBursts == 0):
-            self.processes.remove(event.process)
+            self.numTerminated += 1
             
         else:
             #if time remaining is 0, we should begin io and set time remaining to the new burst time
@@ -256,8 +499,8 @@ class Simulator():
                 #if time remaining is not 0, we simply return to the ready queue
                 event.process.state = State.Ready
                 #expected output requires us to add processes back to the ready queue before switching out in RR, so no need to do it here
-                if (self.algo != Algorithm.RR):
-                    self.ReadyQueue.put(event.process)
+                if (not self.policy.requeueOnSliceExpiry):
+                    event.core.readyQueue.put(event.process)
                 event.process.lastArrivalTime = self.t
         
     """
@@ -272,125 +515,222 @@ class Simulator():
         if (p.timeRemaining == p.cpuBurstTime):
             p.lastBurstArrivalTime = self.t
             
-        if (self.algo == Algorithm.SRT and self.currRunning != None and p.timeRemaining < self.currRunningTimeRemaining()):
-            print("time {0}ms: Process {1} completed I/O and will preempt {2} {3}".format(self.t, p.pid, self.currRunning.pid, self.queueString()))
-            self.preempt(event)
+        core = self.policy.onFinishBlocked(self, p)
+        if (core != None):
+            self.log(TraceKind.IOPreempt, p.pid, core.running.pid, core)
+            self.preempt(core, p)
         else:
-            self.ReadyQueue.put(p)
-            print("time {0}ms: Process {1} completed I/O; added to ready queue {2}".format(self.t, p.pid, self.queueString()))
+            self.arrivalQueue().put(p)
+            self.log(TraceKind.IOComplete, p.pid)
         
     """
     when a process is switched in, we display that information and add a new event for its completion time
     @param event: the event containing information about the process that just switched in
     """
     def handleSwitchIn(self,event):
-        print("time {0}ms: Process {1} started using the CPU {2}{3}".format(
-            self.t, self.currRunning.pid, "" if self.currRunning.timeRemaining == self.currRunning.cpuBurstTime else 
-            "with " + str(self.currRunning.timeRemaining) + "ms remaining ",self.queueString()))
+        core = event.core
+        core.switchInEvent = None
+        if (core.running.timeRemaining == core.running.cpuBurstTime):
+            self.log(TraceKind.SwitchIn, core.running.pid, None, core)
+        else:
+            self.log(TraceKind.SwitchInResume, core.running.pid, core.running.timeRemaining, core)
         self.addProcessFinishEvent(event)
         
         #update number of context switches
         self.totalContextSwitches += 1
+        core.contextSwitches += 1
         
     """
-    get how much context switch time is remaining to switch the current running process out, if any
+    get how much context switch time is remaining to switch the specified core's last process out, if any
+    @param core: the core to check
     @returns the amount of time until the current context switch out finishes, or 0 if no context switch out is currently happening
     """
-    def switchOutRemainingTime(self):
-        for e in self.events.queue:
-            if (e.eType == EventType.SwitchOut):
-                #we found a switch out event: return the difference between the current time and the event time
-                return e.time - self.t
-        return 0
+    def switchOutRemainingTime(self, core):
+        return max(0, core.switchOutEndTime - self.t)
     
     """
-    get the real timeRemaining for the currently running process
+    get the real timeRemaining for the process running on the specified core
+    @param core: the core to check
+    """
+    def runningTimeRemaining(self, core):
+        #the running process keeps a handle to its own burst completion event
+        e = core.running.finishEvent
+        if (e != None and e.eType == EventType.FinishBurst):
+            #return the time left until the burst completion
+            return e.time - self.t
+        #the running process is still switching in, so none of its remaining time has been used yet
+        return core.running.timeRemaining
+        
+    """
+    with per-core ready queues, find a queue for an idle core to steal work from: the longest queue of any other core
+    @param core: the idle core
+    @returns the ready queue to take the next process from, or None if every queue is empty
     """
-    def currRunningTimeRemaining(self):
-        #first iterate through the queue to find this process's burst completion event
-        for e in self.events.queue:
-            if (e.eType == EventType.FinishBurst):
-                #we found a burst finish event: return the time left until the burst completion
-                return e.time - self.t        
+    def stealQueue(self, core):
+        victim = max((c.readyQueue for c in self.cores if c is not core), key=len, default=None)
+        return victim if victim != None and not victim.empty() else None
 
     """
-    check the ready queue for a process to switch in if no process is currently running
+    check the ready queue for a process to switch in on each core that has no process currently running
     """    
     def updateReadyQueue(self):
-        #make sure nothing is running or switching out, and the queue is not empty
-        if (self.currRunning == None and not self.ReadyQueue.empty() and self.switchOutRemainingTime() == 0):
+        for core in self.cores:
+            #make sure nothing is running or switching out on this core, and the queue is not empty
+            if (core.running != None or self.switchOutRemainingTime(core) != 0):
+                continue
+            queue = core.readyQueue
+            if (queue.empty()):
+                if (not self.perCoreQueues):
+                    return
+                queue = self.stealQueue(core)
+                if (queue == None):
+                    continue
             #grab the next event from the ready queue and set it to the running state
-            self.currRunning = self.ReadyQueue.get()
-            self.currRunning.state = State.Running
-            self.addEvent(EventType.SwitchIn, self.t + self.t_cs//2, self.currRunning) 
+            core.running = queue.get()
+            core.running.state = State.Running
+            core.switchInEvent = self.addEvent(EventType.SwitchIn, self.t + self.t_cs//2, core.running, core)
             
             #increment average wait time by how long this process was in the queue
-            self.avgWaitTime += self.t - self.currRunning.lastArrivalTime
+            self.totalWaitTime += self.t - core.running.lastArrivalTime
+            self.startedBursts.add(core.running)
     
     """
     process the specified event, calling the corresponding helper method
     @param event: the event to process
     """
     def processEvent(self, event):
-        #process arrive event type
-        if (event.eType == EventType.Arrive):
-            self.handleArrive(event)
-        #process switch in event type
-        elif (event.eType == EventType.SwitchIn):
-            self.handleSwitchIn(event)
-        #process switch out event type
-        elif (event.eType == EventType.SwitchOut):
-            self.handleSwitchOut(event)
-        #process finish blocked event type
-        elif (event.eType == EventType.FinishBlocked):
-            self.handleFinishBlocked(event)
-        #process finish burst event type
-        elif (event.eType == EventType.FinishBurst):
-            self.handleFinishBurst()
-        #process finish slice event type
-        elif (event.eType == EventType.FinishSlice):
-            self.handleFinishSlice(event)
+        self.handlers[event.priority](event)
 
     """
-    run this simulation
+    read the next group of streamed processes sharing an arrival time and add their arrival events. Keeping a whole group
+    in the event queue at once means same-time arrivals are still ordered by pid, exactly as if every process had been added up front
+    """
+    def scheduleNextArrivals(self):
+        group = next(self.arrivals, None)
+        if (group == None):
+            self.nextArrivalTime = None
+            return
+        t, procs = group
+        if (self.nextArrivalTime != None and t < self.nextArrivalTime):
+            raise ValueError("streamed processes must be in arrival order: arrival time {0} follows {1}".format(t, self.nextArrivalTime))
+        self.nextArrivalTime = t
+        for p in procs:
+            self.n += 1
+            self.totalBursts += p.numBursts
+            self.totalBurstTime += p.cpuBurstTime * p.numBursts
+            self.addEvent(EventType.Arrive, t, p)
+        
     """
-    def run(self):
+    start the simulation: log the start line and schedule the first arrivals. run, step and runUntil all start the
+    simulation themselves, so this only needs calling directly to see the start line before anything else happens
+    """
+    def start(self):
+        if (self.started):
+            return
+        self.started = True
         self.showStartMessage()
-        #populate the event queue with the arrival event for all processes
-        for p in self.processes:
-            self.addEvent(EventType.Arrive,p.arrivalTime, p)
-            
+        #populate the event queue with the arrival event for all processes, or just the first arrival time if we are streaming
+        if (self.arrivals == None):
+            for p in self.processes:
+                self.addEvent(EventType.Arrive,p.arrivalTime, p)
+        else:
+            self.scheduleNextArrivals()
+
+    """
+    run this simulation to completion
+    @returns the final Stats tuple
+    """
+    def run(self):
+        self.start()
+        self.resume()
+        return self.stats()
+        
+    """
+    run the simulation onwards from its current state until it completes, as run does once it has started, or as a
+    simulator restored from a checkpoint does to carry on where the checkpoint left off
+    """
+    def resume(self):
         #jump from event to event
-        while(not self.events.empty()):
-            #get the current event and update time
-            currEvent = self.events.get()
-            self.t = currEvent.time
-            
-            #process the current event
-            self.processEvent(currEvent)
-                
-            #check the ready queue once all same-time events have finished, pulling in a new process if nothing is running now
-            if (len(self.events.queue) == 0 or self.events.queue[0].time != self.t):
-                self.updateReadyQueue()
-            
-        #once we're done running, aggregate our average stats
-        self.avgWaitTime /= self.totalBursts
-        self.avgTurnaroundTime /= self.totalBursts
-                
-        self.showStopMessage()
+        while (self.hasNext()):
+            self.advance()
+        self.finish()
+
+    """
+    process the next event, then finish the simulation if that was the last one
+    @returns the event processed, or None if the simulation had already finished
+    """
+    def step(self):
+        self.start()
+        event = self.advance() if self.hasNext() else None
+        if (not self.hasNext()):
+            self.finish()
+        return event
+
+    """
+    process every event up to and including the specified time, then finish the simulation if there are none left
+    @param t: the time to run until
+    @returns True if the simulation has finished, otherwise False
+    """
+    def runUntil(self, t):
+        self.start()
+        while (self.hasNext() and self.events.peekTime() <= t):
+            self.advance()
+        if (not self.hasNext()):
+            self.finish()
+        return self.finished
+
+    """
+    iterate over the simulation one event at a time, as an alternative to run
+    @returns a generator yielding each event as it is processed
+    """
+    def __iter__(self):
+        while (True):
+            event = self.step()
+            if (event is None):
+                return
+            yield event
+
+    """
+    check whether there is another event to process, noting whether the simulation is being cut off early by maxTime
+    @returns True if there is another event, otherwise False
+    """
+    def hasNext(self):
+        if (self.events.empty()):
+            return False
+        #stop early if we have been given a cutoff and the next event lies beyond it
+        if (self.maxTime != None and self.events.peekTime() > self.maxTime):
+            self.truncated = True
+            return False
+        return True
+
+    """
+    process the next event, along with the ready queue check that follows the last event of each time step
+    @returns the event processed
+    """
+    def advance(self):
+        #get the current event and update time
+        currEvent = self.events.get()
+        self.t = currEvent.time
+        self.numEvents += 1
         
+        #process the current event
+        self.processEvent(currEvent)
+            
+        #check the ready queue once all same-time events have finished, pulling in a new process if nothing is running now
+        if (self.events.peekTime() != self.t):
+            self.updateReadyQueue()
+            #the end of a time step is the only point at which our state is consistent enough to save
+            if (self.checkpoint != None and self.checkpoint.due(self)):
+                self.checkpoint.save(self)
+        return currEvent
+
     """
-    get the state of the ready queue in string form
-    @returns a string representing the contents of the ready queue
-    """
-    def queueString(self):
-        ans = ""
-        if (self.ReadyQueue.empty()):
-            ans = " <empty>"
-        #copy our queue and call get() for each element to gather the copied queue's elements in sorted order
-        qcopy = (queue.PriorityQueue() if self.algo == Algorithm.SRT else queue.Queue())
-        for p in self.ReadyQueue.queue:
-            qcopy.put(p)
-        while (not qcopy.empty()):
-            ans += " " + qcopy.get().pid
-        return "[Q{0}]".format(ans)
\ No newline at end of file
+    finish the simulation: log the stop line, and write our stats block if we were given somewhere to write it
+    """
+    def finish(self):
+        if (self.finished):
+            return
+        self.finished = True
+        self.showStopMessage()
+        if (self.statsOutput != None):
+            self.outputStats(self.statsOutput)
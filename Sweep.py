@@ -0,0 +1,232 @@
+import sys
+import os
+import csv
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from Simulator import Simulator, Algorithm, SIMULATOR_VERSION
+from Policy import POLICIES
+from Trace import NullTraceSink
+from FcfsStats import fcfsStats
+from project1 import readInput
+from Loader import inputHash
+
+"""
+the columns written for each configuration, in order
+"""
+FIELDS = ["input", "algorithm", "t_cs", "t_slice", "cpus", "maxTime", "avgBurstTime", "avgWaitTime", "avgTurnaroundTime",
+          "maxTurnaroundTime", "totalContextSwitches", "totalPreemptions", "truncated", "version"]
+
+"""
+parse a range of integer parameter values
+@param spec: either a single value ("8"), a comma separated list ("4,8,16") or an inclusive start:stop[:step] range ("2:16:2")
+@returns a list of ints
+"""
+def parseRange(spec):
+    values = []
+    for part in spec.split(','):
+        if (':' in part):
+            bounds = [int(b) for b in part.split(':')]
+            step = bounds[2] if len(bounds) > 2 else 1
+            values.extend(range(bounds[0], bounds[1] + 1, step))
+        else:
+            values.append(int(part))
+    return values
+
+"""
+build the list of configurations for a sweep; t_slice only affects the sliced policies (RR, MLFQ and STRIDE), so the
+other algorithms are run once per t_cs
+@param algos: the algorithms to sweep over
+@param tcsValues: the context switch times to sweep over
+@param sliceValues: the time-slices to sweep over
+@param cpuValues: the numbers of CPUs to sweep over
+@returns a list of (algo, t_cs, t_slice, cpus) tuples, with t_slice set to None where it is irrelevant
+"""
+def buildConfigs(algos, tcsValues, sliceValues, cpuValues=(1,)):
+    configs = []
+    for algo in algos:
+        for t_cs in tcsValues:
+            for t_slice in (sliceValues if POLICIES[algo].sliced else [None]):
+                for cpus in cpuValues:
+                    configs.append((algo, t_cs, t_slice, cpus))
+    return configs
+
+"""
+simulate a single configuration without any trace output
+@param config: an (algo, t_cs, t_slice, cpus) tuple
+@param maxTime: the early cutoff time, or None to run to completion
+@param processes: the processes to simulate
+@returns the resulting Stats tuple
+"""
+def runConfig(config, maxTime, processes):
+    algo, t_cs, t_slice, cpus = config
+    #FCFS on a single CPU has a stats-only fast path, which gives the same numbers without simulating each event
+    if (algo == Algorithm.FCFS and cpus == 1 and maxTime is None):
+        return fcfsStats(processes, t_cs)
+    sim = Simulator(algo, processes, trace=NullTraceSink(), t_cs=t_cs, t_slice=70 if t_slice is None else t_slice,
+                    maxTime=maxTime, numCpus=cpus)
+    return sim.run()
+
+"""
+build the output row for a single configuration
+@param inputName: the name of the input file, recorded in each row along with its hash
+@param config: the (algo, t_cs, t_slice, cpus) tuple that was simulated
+@param maxTime: the early cutoff time, or None
+@param stats: the resulting Stats tuple
+@returns a dict with one entry per FIELDS column
+"""
+def makeRow(inputName, config, maxTime, stats):
+    algo, t_cs, t_slice, cpus = config
+    row = {"input": inputName, "algorithm": algo.name, "t_cs": t_cs, "t_slice": t_slice, "cpus": cpus, "maxTime": maxTime,
+           "version": SIMULATOR_VERSION}
+    row.update(stats._asdict())
+    return {f: row[f] for f in FIELDS}
+
+"""
+get the key identifying a row in the result cache
+@param row: a result row, either freshly built or read back from disk
+@returns a hashable key of the input, every parameter that affects the result, and the SIMULATOR_VERSION that produced it
+"""
+def rowKey(row):
+    def norm(v):
+        return None if v in (None, "", "None") else int(v)
+    #rows written before the cpus column existed were all simulated on a single CPU
+    cpus = norm(row.get("cpus"))
+    #rows written before the version column existed never match, so they are simulated again
+    return (row["input"], row["algorithm"], norm(row["t_cs"]), norm(row["t_slice"]), 1 if cpus is None else cpus,
+            norm(row["maxTime"]), norm(row.get("version")))
+
+"""
+read back any rows already written to a sweep output file, so they can be reused instead of re-simulated
+@param fileName: the CSV or JSON lines file to read
+@returns a dict mapping rowKey to row
+"""
+def loadRows(fileName):
+    rows = {}
+    if (not os.path.exists(fileName)):
+        return rows
+    with open(fileName, newline='') as f:
+        if (fileName.endswith(".csv")):
+            reader = csv.DictReader(f)
+        else:
+            reader = (json.loads(line) for line in f if line.strip() != "")
+        for row in reader:
+            rows[rowKey(row)] = row
+    return rows
+
+"""
+run a sweep over every configuration, reusing any cached rows and spreading the rest across a process pool
+@param processes: the processes to simulate, parsed once by the caller
+@param configs: a list of (algo, t_cs, t_slice, cpus) tuples, as built by buildConfigs
+@param inputName: the label recorded in each row; the workload hash is appended so edited inputs are never confused
+@param maxTime: the early cutoff time for every run, or None to run to completion
+@param cache: a dict of previously computed rows keyed by rowKey, as returned by loadRows
+@param workers: the maximum number of worker processes to use; 1 runs everything in this process
+@returns a generator yielding (row, cached) tuples in configuration order
+"""
+def sweep(processes, configs, inputName, maxTime=None, cache=None, workers=None):
+    label = "{0}#{1}".format(inputName, inputHash(processes))
+    cache = {} if cache is None else cache
+    #only simulate the configurations that are not already in the cache
+    pending = [c for c in configs if (label, c[0].name, c[1], c[2], c[3], maxTime, SIMULATOR_VERSION) not in cache]
+    if (workers is None):
+        workers = min(len(pending), os.cpu_count() or 1)
+
+    pool = None
+    futures = []
+    if (workers <= 1):
+        results = (runConfig(c, maxTime, processes) for c in pending)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = [pool.submit(runConfig, c, maxTime, processes) for c in pending]
+        results = (f.result() for f in futures)
+    try:
+        #results arrive in the same order as pending, so we can interleave them with the cached rows as we go
+        for c in configs:
+            key = (label, c[0].name, c[1], c[2], c[3], maxTime, SIMULATOR_VERSION)
+            if (key in cache):
+                yield cache[key], True
+            else:
+                yield makeRow(label, c, maxTime, next(results)), False
+    finally:
+        if (pool != None):
+            #drop any configurations that have not started yet, e.g. if the caller stopped iterating early
+            for f in futures:
+                f.cancel()
+            pool.shutdown()
+
+"""
+rewrite a CSV sweep output file whose header is not FIELDS, e.g. one written before the cpus, maxTurnaroundTime and
+version columns were added, so that new rows can be appended under the current header. Existing rows keep their values;
+columns they lack are left empty (cpus is filled in as 1, as rowKey assumes), and columns no longer written are dropped.
+Rows left without a version never match the cache, so their configurations are simulated again
+@param fileName: the CSV file to check
+"""
+def migrateCsv(fileName):
+    with open(fileName, newline='') as f:
+        reader = csv.DictReader(f)
+        if (reader.fieldnames == FIELDS):
+            return
+        rows = list(reader)
+    for row in rows:
+        if (row.get("cpus") in (None, "")):
+            row["cpus"] = 1
+    tmpName = fileName + ".tmp"
+    with open(tmpName, 'w', newline='') as f:
+        writer = csv.DictWriter(f, FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmpName, fileName)
+
+"""
+append rows to a sweep output file, writing the CSV header if the file is new and first migrating an existing CSV file
+written with an older header
+@param fileName: the file to append to; a .csv extension selects CSV, anything else selects JSON lines
+@param rows: the rows to write
+"""
+def writeRows(fileName, rows):
+    isNew = not os.path.exists(fileName) or os.path.getsize(fileName) == 0
+    if (not isNew and fileName.endswith(".csv")):
+        migrateCsv(fileName)
+    with open(fileName, 'a', newline='') as f:
+        if (fileName.endswith(".csv")):
+            writer = csv.DictWriter(f, FIELDS)
+            if (isNew):
+                writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                f.write(json.dumps(row, separators=(',', ':')) + "\n")
+
+"""
+main method: parse the input file once, then sweep over the requested parameter grid, appending one row per new configuration
+"""
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the simulator over a grid of algorithms, t_cs, t_slice and CPU counts")
+    parser.add_argument("input", help="the process input file")
+    parser.add_argument("output", help="the results file to append to (.csv for CSV, otherwise JSON lines); existing rows are reused")
+    parser.add_argument("--algos", default="FCFS,SRT,RR", help="comma separated algorithms, from {0} (default: FCFS,SRT,RR)".format(
+                        ",".join(a.name for a in Algorithm)))
+    parser.add_argument("--tcs", default="8", help="context switch times, e.g. 8, 4,8,16 or 2:16:2 (default: 8)")
+    parser.add_argument("--slice", default="70", help="time-slices for RR, MLFQ and STRIDE, in the same form as --tcs (default: 70)")
+    parser.add_argument("--cpus", default="1", help="numbers of CPUs, in the same form as --tcs (default: 1)")
+    parser.add_argument("--max-time", type=int, default=None, help="stop each run early once it passes this time (ms)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    try:
+        algos = [Algorithm[a.strip()] for a in args.algos.split(',')]
+        configs = buildConfigs(algos, parseRange(args.tcs), parseRange(args.slice), parseRange(args.cpus))
+    except (KeyError, ValueError) as e:
+        parser.error("invalid parameter grid: {0}".format(e))
+
+    processes = readInput(args.input)
+    cache = loadRows(args.output)
+    newRows = [row for row, cached in sweep(processes, configs, os.path.basename(args.input), args.max_time, cache, args.workers)
+               if not cached]
+    writeRows(args.output, newRows)
+    print("{0} configurations, {1} simulated, {2} reused".format(len(configs), len(newRows), len(configs) - len(newRows)),
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
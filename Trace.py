@@ -0,0 +1,160 @@
+from enum import Enum
+from collections import namedtuple, deque
+import sys
+
+"""
+TraceKind is a simple enum containing each of the kinds of line the simulator can log
+"""
+class TraceKind(Enum):
+    Start = 1
+    Stop = 2
+    Arrive = 3
+    ArrivePreempt = 4
+    SliceExpired = 5
+    SlicePreempt = 6
+    Terminate = 7
+    BurstComplete = 8
+    BlockOnIO = 9
+    IOComplete = 10
+    IOPreempt = 11
+    SwitchIn = 12
+    SwitchInResume = 13
+
+"""
+text format for each TraceKind; fields are {0} time, {1} pid, {2} arg, {3} rendered ready queue and {4} the plural
+suffix for arg. Stop is the only line that is not terminated by a newline, as the driver prints the separator itself
+"""
+TEXT_FORMATS = {
+    TraceKind.Start: "time {0}ms: Simulator started for {2} {3}\n",
+    TraceKind.Stop: "time {0}ms: Simulator ended for {2}",
+    TraceKind.Arrive: "time {0}ms: Process {1} arrived and added to ready queue {3}\n",
+    TraceKind.ArrivePreempt: "time {0}ms: Process {1} arrived and will preempt {2} {3}\n",
+    TraceKind.SliceExpired: "time {0}ms: Time slice expired; no preemption because ready queue is empty {3}\n",
+    TraceKind.SlicePreempt: "time {0}ms: Time slice expired; process {1} preempted with {2}ms to go {3}\n",
+    TraceKind.Terminate: "time {0}ms: Process {1} terminated {3}\n",
+    TraceKind.BurstComplete: "time {0}ms: Process {1} completed a CPU burst; {2} burst{4} to go {3}\n",
+    TraceKind.BlockOnIO: "time {0}ms: Process {1} switching out of CPU; will block on I/O until time {2}ms {3}\n",
+    TraceKind.IOComplete: "time {0}ms: Process {1} completed I/O; added to ready queue {3}\n",
+    TraceKind.IOPreempt: "time {0}ms: Process {1} completed I/O and will preempt {2} {3}\n",
+    TraceKind.SwitchIn: "time {0}ms: Process {1} started using the CPU {3}\n",
+    TraceKind.SwitchInResume: "time {0}ms: Process {1} started using the CPU with {2}ms remaining {3}\n",
+}
+
+"""
+TraceRecord is a single structured trace entry: the time, kind, pid and argument of the line, a tuple of the pids
+in the ready queue at that moment, and the CPU the line refers to (None unless there is more than one CPU)
+"""
+TraceRecord = namedtuple("TraceRecord", ["time", "kind", "pid", "arg", "queue", "cpu"])
+
+"""
+format a single trace line exactly as the simulator has always printed it
+@param t: the time of the line
+@param kind: the TraceKind of the line
+@param pid: the process the line refers to, or None
+@param arg: the extra argument for the line (another pid, a time or a count), or None
+@param queueString: the rendered ready queue
+@param cpu: the CPU the line refers to, shown after the time as "[CPU k]", or None
+@returns the formatted line
+"""
+def formatLine(t, kind, pid, arg, queueString, cpu=None):
+    line = TEXT_FORMATS[kind].format(t, pid, arg, queueString, "" if arg == 1 else "s")
+    if (cpu is None):
+        return line
+    prefix = "time {0}ms: ".format(t)
+    return "{0}[CPU {1}] {2}".format(prefix, cpu, line[len(prefix):])
+
+"""
+NullTraceSink discards every line without formatting it; use it when only the summary stats are wanted
+"""
+class NullTraceSink():
+    enabled = False
+
+    def write(self, t, kind, pid, arg, readyQueue, cpu=None):
+        pass
+
+    def flush(self):
+        pass
+
+"""
+TextTraceSink formats each line in the usual 'time Xms: ...' form and writes it to a stream in large blocks
+"""
+class TextTraceSink():
+    enabled = True
+
+    """
+    TextTraceSink constructor: creates a new text sink
+    @param stream: the stream to write to; defaults to standard output
+    @param bufferSize: the number of characters to accumulate before writing them out
+    """
+    def __init__(self, stream=None, bufferSize=1 << 16):
+        self.stream = sys.stdout if stream is None else stream
+        self.bufferSize = bufferSize
+        self.buffer = []
+        self.buffered = 0
+
+    """
+    format and buffer a single trace line
+    @param t: the time of the line
+    @param kind: the TraceKind of the line
+    @param pid: the process the line refers to, or None
+    @param arg: the extra argument for the line, or None
+    @param readyQueue: the simulator's ready queue, which is only rendered here
+    @param cpu: the CPU the line refers to, or None
+    """
+    def write(self, t, kind, pid, arg, readyQueue, cpu=None):
+        line = formatLine(t, kind, pid, arg, readyQueue.render(), cpu)
+        self.buffer.append(line)
+        self.buffered += len(line)
+        if (self.buffered >= self.bufferSize):
+            self.flush()
+
+    """
+    write any buffered lines out to the stream
+    """
+    def flush(self):
+        if (self.buffer):
+            self.stream.write("".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+        self.stream.flush()
+
+"""
+RecordTraceSink collects structured TraceRecords rather than text. Iterating over the sink drains the records
+collected so far, and an optional callback receives each record as soon as it is logged
+"""
+class RecordTraceSink():
+    enabled = True
+
+    """
+    RecordTraceSink constructor: creates a new record sink
+    @param callback: a function to call with each TraceRecord; if given, records are not also kept by the sink
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.records = deque()
+
+    """
+    build a TraceRecord for a single trace line
+    @param t: the time of the line
+    @param kind: the TraceKind of the line
+    @param pid: the process the line refers to, or None
+    @param arg: the extra argument for the line, or None
+    @param readyQueue: the simulator's ready queue
+    @param cpu: the CPU the line refers to, or None
+    """
+    def write(self, t, kind, pid, arg, readyQueue, cpu=None):
+        record = TraceRecord(t, kind, pid, arg, readyQueue.pids(), cpu)
+        if (self.callback != None):
+            self.callback(record)
+        else:
+            self.records.append(record)
+
+    def flush(self):
+        pass
+
+    """
+    yield the records collected so far, removing them from the sink
+    """
+    def __iter__(self):
+        while (self.records):
+            yield self.records.popleft()
@@ -0,0 +1,153 @@
+import sys
+import random
+import argparse
+from Process import Process
+
+"""
+the header written at the top of each generated input file, matching the sample inputs
+"""
+HEADER = "# <proc-id>|<initial-arrival-time>|<cpu-burst-time>|<num-bursts>|<io-time>\n"
+
+"""
+the default shape of a generated workload: a mix of CPU-bound processes (long bursts, short i/o) and i/o-bound
+processes (short bursts, long i/o), all times in milliseconds
+"""
+DEFAULTS = {
+    "meanInterarrival": 1500.0,
+    "cpuBoundFraction": 0.2,
+    "cpuBoundBurst": 800.0,
+    "cpuBoundIO": 100.0,
+    "ioBoundBurst": 60.0,
+    "ioBoundIO": 1500.0,
+    "meanBursts": 6.0,
+}
+
+"""
+get the pid for the i'th generated process. Pids are fixed width, so the string comparison Process.__lt__ uses for
+tie-breaking orders them the same way as they were generated
+@param i: the index of the process
+@param n: the total number of processes, which determines the width
+@param scheme: "letters" for base-26 pids (A..Z for up to 26 processes, then AA, AB...), or "numeric" for P0, P1...
+@returns the pid string
+"""
+def makePid(i, n, scheme="letters"):
+    if (scheme == "numeric"):
+        return "P{0:0{1}d}".format(i, len(str(max(n - 1, 0))))
+    width = 1
+    while (26 ** width < n):
+        width += 1
+    chars = []
+    for _ in range(width):
+        i, r = divmod(i, 26)
+        chars.append(chr(ord('A') + r))
+    return "".join(reversed(chars))
+
+"""
+draw a positive integer time from an exponential distribution with the specified mean
+@param rng: the random number generator to draw from
+@param mean: the mean of the distribution; a mean of 0 always gives 0
+@returns an int of at least 1, or 0 if the mean is 0
+"""
+def expTime(rng, mean):
+    if (mean <= 0):
+        return 0
+    return max(1, int(round(rng.expovariate(1.0 / mean))))
+
+"""
+generate the fields of a reproducible synthetic workload, one process at a time, in arrival order
+@param n: the number of processes to generate
+@param seed: the random seed; the same seed and parameters always produce the same workload
+@param pidScheme: the pid scheme passed to makePid
+@param params: overrides for any of the DEFAULTS
+@returns a generator yielding (pid, arrivalTime, cpuBurstTime, numBursts, ioTime) tuples
+"""
+def generate(n, seed=0, pidScheme="letters", **params):
+    for k in params:
+        if (k not in DEFAULTS):
+            raise TypeError("unknown workload parameter: {0}".format(k))
+    spec = dict(DEFAULTS, **params)
+    rng = random.Random(seed)
+    t = 0
+    for i in range(n):
+        #the first process arrives at time 0, and each following one after an exponential interarrival gap
+        if (i > 0):
+            t += int(round(rng.expovariate(1.0 / spec["meanInterarrival"]))) if spec["meanInterarrival"] > 0 else 0
+        if (rng.random() < spec["cpuBoundFraction"]):
+            burst, io = expTime(rng, spec["cpuBoundBurst"]), expTime(rng, spec["cpuBoundIO"])
+        else:
+            burst, io = expTime(rng, spec["ioBoundBurst"]), expTime(rng, spec["ioBoundIO"])
+        #every process has at least one burst, even with a mean of 0
+        numBursts = max(1, expTime(rng, spec["meanBursts"]))
+        #a single-burst process never blocks on i/o, which the sample inputs record as an i/o time of 0
+        yield (makePid(i, n, pidScheme), t, burst, numBursts, io if numBursts > 1 else 0)
+
+"""
+generate a synthetic workload as input file lines
+@param n: the number of processes to generate
+@param seed: the random seed
+@param pidScheme: the pid scheme passed to makePid
+@param params: overrides for any of the DEFAULTS
+@returns a generator yielding '<proc-id>|<arrival>|<burst>|<num-bursts>|<io>' lines
+"""
+def generateLines(n, seed=0, pidScheme="letters", **params):
+    for fields in generate(n, seed, pidScheme, **params):
+        yield "{0}|{1}|{2}|{3}|{4}\n".format(*fields)
+
+"""
+generate a synthetic workload as Process objects, exactly as readInput would have parsed them from the written file
+@param n: the number of processes to generate
+@param seed: the random seed
+@param pidScheme: the pid scheme passed to makePid
+@param params: overrides for any of the DEFAULTS
+@returns a generator yielding processes in arrival order
+"""
+def generateProcesses(n, seed=0, pidScheme="letters", **params):
+    for fields in generate(n, seed, pidScheme, **params):
+        yield Process.fromFields(*fields)
+
+"""
+stream a synthetic workload out to an input file
+@param f: the open file (or other stream) to write to
+@param n: the number of processes to generate
+@param seed: the random seed
+@param pidScheme: the pid scheme passed to makePid
+@param params: overrides for any of the DEFAULTS
+"""
+def writeWorkload(f, n, seed=0, pidScheme="letters", **params):
+    f.write("# generated workload: n={0} seed={1} {2}\n#\n".format(
+        n, seed, " ".join("{0}={1}".format(k, v) for k, v in sorted(dict(DEFAULTS, **params).items()))))
+    f.write(HEADER)
+    #write in blocks rather than line by line, as workloads may run to millions of lines
+    block = []
+    for line in generateLines(n, seed, pidScheme, **params):
+        block.append(line)
+        if (len(block) >= 4096):
+            f.write("".join(block))
+            block = []
+    f.write("".join(block))
+
+"""
+main method: write a generated workload to the specified file, or to standard output if none is given
+"""
+def main():
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic workload in the p1-input format")
+    parser.add_argument("n", type=int, help="the number of processes to generate")
+    parser.add_argument("output", nargs="?", default=None, help="the file to write (default: standard output)")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed (default: 0)")
+    parser.add_argument("--pids", choices=["letters", "numeric"], default="letters", help="the pid scheme (default: letters)")
+    for k, v in sorted(DEFAULTS.items()):
+        parser.add_argument("--" + k, type=float, default=v, help="(default: {0})".format(v))
+    args = parser.parse_args()
+    params = {k: getattr(args, k) for k in DEFAULTS}
+    for k, v in sorted(params.items()):
+        if (v < 0):
+            parser.error("--{0} must not be negative".format(k))
+
+    if (args.output is None):
+        writeWorkload(sys.stdout, args.n, args.seed, args.pids, **params)
+    else:
+        with open(args.output, 'w') as f:
+            writeWorkload(f, args.n, args.seed, args.pids, **params)
+
+if __name__ == "__main__":
+    main()
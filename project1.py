@@ -1,6 +1,15 @@
 import sys
-from Process import Process
-from Simulator import Simulator, Algorithm
+import os
+import io
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from Loader import loadTable, InputError
+from Checkpoint import openRun, runWithCheckpoints
+from BinaryTrace import runWithBinaryTrace
+from ResultCache import ResultCache, workloadDigest, resultKey
+from Simulator import Simulator, Algorithm, formatStats
+from FcfsStats import fcfsStats
+from Trace import NullTraceSink, TextTraceSink
     
 """
 display a message on standard error and exit the program
@@ -10,35 +19,162 @@ def exitError(msg):
     print("Error:",msg,file=sys.stderr)
     sys.exit(1)
     
+"""
+get the value following an option on the command line
+@param name: the option, such as "--checkpoint"
+@param default: the value to use if the option is not given
+@returns the value of the option as a string, or default
+"""
+def optionValue(name, default=None):
+    args = sys.argv[3:]
+    if (name not in args):
+        return default
+    i = args.index(name)
+    if (i + 1 == len(args)):
+        exitError("{0} needs a value".format(name))
+    return args[i + 1]
+    
 """
 read the process info from the specified input file
 @param fileName: the name of the file containing our process info
-@returns a list of processes corresponding to the data in the input file
+@returns a ProcessTable of the data in the input file; each Simulator builds its own processes from it
 """
 def readInput(fileName):
-    processes = []
     try:
-        #read the file line by line, ignoring lines that start with a # or lines that are entirely whitespace
-        for line in (l for l in open(fileName) if l[0] != '#' and l.strip() != ""):
-            processes.append(Process(*(line.strip().split('|'))))
-    except (IOError, TypeError):
+        #read the file in large blocks and validate it a column at a time, ignoring lines that start with a # or lines that are entirely whitespace
+        return loadTable(fileName)
+    except IOError:
         exitError("Invalid input file format")
-    return processes
+    except InputError as e:
+        exitError("Invalid input file format ({0})".format(e))
+  
+"""
+run a single simulation with its trace captured in memory; this is the unit of work handed to each worker process
+@param algo: the algorithm to simulate
+@param processes: the processes to simulate
+@param quiet: whether to skip the trace entirely
+@returns a (trace, stats) tuple of strings
+"""
+def runSimulation(algo, processes, quiet):
+    #without a trace, FCFS only needs its stats, which fcfsStats computes without simulating each event
+    if (quiet and algo == Algorithm.FCFS):
+        return "", formatStats(fcfsStats(processes))
+    out = io.StringIO()
+    sim = Simulator(algo, processes, trace=NullTraceSink() if quiet else TextTraceSink(out))
+    sim.run()
+    return out.getvalue(), sim.statsString()
+
+"""
+run a simulation for each of the specified algorithms, spreading them across a pool of worker processes
+@param algos: the algorithms to simulate
+@param processes: the processes to simulate
+@param quiet: whether to skip the traces entirely
+@param workers: the maximum number of worker processes to use; 1 runs everything in this process
+@param run: the function which runs each simulation, called as run(algo, processes, quiet); it must be picklable
+@returns a list of (trace, stats) tuples in the same order as algos
+"""
+def runAll(algos, processes, quiet=False, workers=None, run=runSimulation):
+    if (workers is None):
+        workers = min(len(algos), os.cpu_count() or 1)
+    if (workers <= 1):
+        return [run(algo, processes, quiet) for algo in algos]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, algo, processes, quiet) for algo in algos]
+        return [f.result() for f in futures]
   
 """
-main method: parse the input file while checking for errors, then start our simulator instance
+run each simulation whose result is not already in the result cache, then store the new results in it
+@param algos: the algorithms to simulate
+@param processes: the processes to simulate
+@param quiet: whether to skip the traces entirely; cached stats can then be used even where no trace was cached
+@param workers: the maximum number of worker processes to use for the simulations that do need to run
+@param run: the function which runs each simulation, as for runAll
+@param cache: the ResultCache to use
+@returns a list of (trace, stats) tuples in the same order as algos, where each trace is None if quiet
+"""
+def runCached(algos, processes, quiet, workers, run, cache):
+    workload = workloadDigest(processes)
+    keys = [resultKey(workload, algo) for algo in algos]
+    results = [cache.get(key, not quiet) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    for i, result in zip(missing, runAll([algos[i] for i in missing], processes, quiet, workers, run)):
+        results[i] = result
+        cache.put(keys[i], None if quiet else result[0], result[1])
+    return results
+  
+"""
+join the traces of several simulations into the form main prints them in, which matches the p1-output files exactly
+@param traces: the trace of each simulation, in order
+@returns the full standard output text
+"""
+def formatTraces(traces):
+    return "\n\n".join(traces) + "\n"
+  
+"""
+main method: parse the input file while checking for errors, then start our simulator instances
+pass --quiet after the file names to skip the event log entirely and only write the stats file,
+and --serial to run every algorithm in this process rather than in parallel worker processes.
+--checkpoint DIR saves snapshots of each simulation in DIR as it runs (every --checkpoint-events events, 1000000 by
+default, and/or every --checkpoint-ms simulated milliseconds), and --resume DIR carries on from them after a crash,
+producing exactly the output an uninterrupted run would have.
+--binary-trace DIR writes each trace to DIR/<algorithm>.bin in the compact binary format instead of printing it;
+BinaryTrace.py turns these back into text.
+--cache DIR reuses the results of earlier runs of the same input kept in DIR, only simulating what is missing, and keeps
+DIR within --cache-size megabytes (1024 by default) by discarding the least recently used results
 """      
 def main():
     #make sure the user specifies the correct number of arguments
     if (len(sys.argv) < 3):
-        exitError("ERROR: Invalid arguments\nUSAGE: /usr/bin/python3.5 project1.py p1-input01.txt simout01.txt")
-    #extract our processes from the input file, then begin the simulation
+        exitError("ERROR: Invalid arguments\nUSAGE: /usr/bin/python3.5 project1.py p1-input01.txt simout01.txt [--quiet] [--serial] "
+                  "[--checkpoint DIR | --resume DIR] [--checkpoint-events N] [--checkpoint-ms T] [--binary-trace DIR] [--cache DIR] [--cache-size MB]")
+    quiet = "--quiet" in sys.argv[3:]
+    serial = "--serial" in sys.argv[3:]
+    resume = "--resume" in sys.argv[3:]
+    directory = optionValue("--resume" if resume else "--checkpoint")
+    try:
+        everyMs = optionValue("--checkpoint-ms")
+        everyMs = None if everyMs is None else int(everyMs)
+        everyEvents = int(optionValue("--checkpoint-events", 1000000 if everyMs is None else 0)) or None
+    except ValueError:
+        exitError("--checkpoint-events and --checkpoint-ms need integer values")
+    #extract our processes from the input file, then begin the simulations
     processes = readInput(sys.argv[1])
-    Simulator(Algorithm.FCFS, processes)
-    print("\n")
-    Simulator(Algorithm.SRT, processes)
-    print("\n")
-    Simulator(Algorithm.RR, processes)
+    run = runSimulation
+    statsOffset = None
+    binaryDirectory = optionValue("--binary-trace")
+    if (binaryDirectory != None):
+        if (directory != None):
+            exitError("--binary-trace cannot be combined with --checkpoint or --resume")
+        run = partial(runWithBinaryTrace, directory=binaryDirectory)
+    elif (directory != None):
+        try:
+            statsOffset = openRun(directory, processes, sys.argv[2], quiet, resume)
+        except ValueError as e:
+            exitError(str(e))
+        run = partial(runWithCheckpoints, directory=directory, everyEvents=everyEvents, everyMs=everyMs, resume=resume)
+    algos = [Algorithm.FCFS, Algorithm.SRT, Algorithm.RR]
+    cacheDirectory = optionValue("--cache")
+    if (cacheDirectory != None):
+        if (binaryDirectory != None):
+            exitError("--cache cannot be combined with --binary-trace")
+        try:
+            cacheSize = int(optionValue("--cache-size", 1024))
+        except ValueError:
+            exitError("--cache-size needs an integer value")
+        results = runCached(algos, processes, quiet, 1 if serial else None, run, ResultCache(cacheDirectory, cacheSize << 20))
+    else:
+        results = runAll(algos, processes, quiet, 1 if serial else None, run)
+    
+    #write the traces and stats blocks out in algorithm order, regardless of which worker finished first
+    if (not quiet and binaryDirectory is None):
+        sys.stdout.write(formatTraces([trace for trace, _ in results]))
+        sys.stdout.flush()
+    fName = sys.argv[2]
+    with open(fName, 'a' if os.path.exists(fName) else 'w') as f:
+        #a resumed run first cuts off anything an earlier attempt appended
+        if (statsOffset != None):
+            f.truncate(statsOffset)
+        f.write("".join(stats for _, stats in results))
     
 if __name__ == "__main__":
     main()
\ No newline at end of file